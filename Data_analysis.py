@@ -2,11 +2,14 @@ import pandas as pd
 import numpy as np
 import scipy.stats as stats
 import statsmodels.stats.multicomp as multi
+from bootstrap import confidence_intervals
+from columnar_results import read_results
+from result_summary import summarize
 
 
 def load_data(filename):
     try:
-        df = pd.read_csv(filename)
+        df = read_results(filename)
         return df
     except FileNotFoundError:
         print("File not found. Please check the filename or path.")
@@ -14,11 +17,9 @@ def load_data(filename):
 
 
 def preprocess_data(df):
-    unique_methods = df["Method"].unique()
-    data = []
-    for method in unique_methods:
-        method_data = df[df["Method"] == method]["Time"]
-        data.append(method_data)
+    groups = df.groupby("Method", sort=False, observed=True)["Time"]
+    unique_methods = np.array(list(groups.groups))
+    data = [method_data for method, method_data in groups]
     return unique_methods, data
 
 
@@ -38,7 +39,7 @@ def check_variances_homogeneity(data):
 
 
 def perform_kruskal_wallis_test(df):
-    groups = [group['Time'].values for name, group in df.groupby('Method')]
+    groups = [group['Time'].values for name, group in df.groupby('Method', observed=True)]
     kruskal_result = stats.kruskal(*groups)
     print(f"Kruskal-Wallis Test: H-statistic = {kruskal_result.statistic}, p-value = {kruskal_result.pvalue}")
     return kruskal_result.pvalue
@@ -67,10 +68,20 @@ def games_howell_posthoc(data_dict):
     return posthoc_results.summary()
 
 
-def main():
-    filename = 'optimization_results2.csv'
+def perform_bootstrap(df, n_resamples=10000, seed=0, workers=None):
+    intervals, differences = confidence_intervals(df, n_resamples=n_resamples, seed=seed, workers=workers)
+    print(f"Bootstrap 95% confidence intervals of the time ({n_resamples} resamples):")
+    print(intervals.to_string(index=False))
+    print("Bootstrap 95% confidence intervals of the pairwise time differences (A - B):")
+    print(differences.to_string(index=False))
+    return intervals, differences
+
+
+def main(filename='optimization_results2.npy', n_resamples=10000, seed=0, workers=None):
     df = load_data(filename)
     if df is not None:
+        print(summarize(df, keys=["Method"]).to_string(index=False))
+        perform_bootstrap(df, n_resamples, seed, workers)
         unique_methods, data = preprocess_data(df)
         perform_shapiro_tests(data, unique_methods)
         check_variances_homogeneity(data)
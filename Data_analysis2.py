@@ -1,19 +1,24 @@
 import pandas as pd
 import matplotlib.pyplot as plt
-from typing import Dict
+from typing import Dict, List, Optional
+from columnar_results import read_results
+from figure_rendering import FigureJob, render_figures
+
+# Phase breakdown of every timed run, see instrumentation.PhaseTimer
+PHASE_COLUMNS = ['Symbolic Time', 'Compile Time', 'Iteration Time', 'Finalize Time']
 
 
 def read_and_filter_csv(file_path: str) -> pd.DataFrame:
     """
-    Read the CSV file and filter the rows where the result is 'Success'.
+    Read the result file (columnar or CSV) and filter the rows where the result is 'Success'.
 
     Args:
-    - file_path (str): Path to the CSV file.
+    - file_path (str): Path to the result file.
 
     Returns:
     - pd.DataFrame: Filtered DataFrame.
     """
-    df = pd.read_csv(file_path)
+    df = read_results(file_path)
     return df[df["Result"] == "Success"]
 
 
@@ -27,52 +32,117 @@ def compute_correlations(df: pd.DataFrame) -> Dict[str, float]:
     Returns:
     - Dict[str, float]: Dictionary of correlations for each method.
     """
-    methods = df['Method'].unique()
-    correlations = {}
+    return {method: method_df['Iterations'].corr(method_df['Precision'], method="spearman")
+            for method, method_df in df.groupby('Method', sort=False, observed=True)}
+
+
+def draw_scatter_plot(method_df: pd.DataFrame, method: str) -> None:
+    """
+    Draw the scatter plot of iterations vs. precision of a single method.
+
+    Args:
+    - method_df (pd.DataFrame): The optimization results of the method.
+    - method (str): The method name.
+    """
+    plt.scatter(method_df['Iterations'], method_df['Precision'], label='Data Points')
+
+    plt.title(f'Scatter Plot for Method: {method}')
+    plt.xlabel('Iterations')
+    plt.ylabel('Precision')
+    plt.legend()
+
+
+def scatter_figures(df: pd.DataFrame) -> List[FigureJob]:
+    """
+    Build the scatter plots of iterations vs. precision for each method.
 
-    for method in methods:
-        method_df = df[df['Method'] == method]
-        correlation = method_df['Iterations'].corr(method_df['Precision'], method="spearman")
-        correlations[method] = correlation
+    Args:
+    - df (pd.DataFrame): The DataFrame containing optimization results.
 
-    return correlations
+    Returns:
+    - List[FigureJob]: One figure per method.
+    """
+    method_groups = df[['Iterations', 'Precision']].groupby(df['Method'], sort=False, observed=True)
+    return [FigureJob(f'images/Plots{index}.png', draw_scatter_plot, method_df, (method,))
+            for index, (method, method_df) in enumerate(method_groups)]
 
 
-def plot_scatter_plots(df: pd.DataFrame) -> None:
+def plot_scatter_plots(df: pd.DataFrame, workers: Optional[int] = None, show: bool = False) -> None:
     """
     Plot scatter plots of iterations vs. precision for each method.
 
     Args:
     - df (pd.DataFrame): The DataFrame containing optimization results.
+    - workers (Optional[int]): Number of rendering processes; None uses every CPU core.
+    - show (bool): Show every figure interactively instead of rendering them headless.
+    """
+    render_figures(scatter_figures(df), workers, show)
+
+
+def compute_phase_times(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Compute the mean time of every phase (symbolic preparation, compilation, iteration and finalization) for each
+    method.
+
+    Args:
+    - df (pd.DataFrame): The DataFrame containing optimization results.
+
+    Returns:
+    - pd.DataFrame: Mean phase times in milliseconds, one row per method and one column per phase.
+    """
+    phase_times = df.groupby('Method', sort=False, observed=True)[PHASE_COLUMNS].mean() * 1000
+    phase_times.columns = [column.removesuffix(' Time') for column in PHASE_COLUMNS]
+    return phase_times
+
+
+def draw_phase_bars(phase_times: pd.DataFrame) -> None:
     """
-    methods = df['Method'].unique()
+    Draw the mean phase times of every method as stacked bars.
 
-    for index, method in enumerate(methods):
-        method_df = df[df['Method'] == method]
-        plt.scatter(method_df['Iterations'], method_df['Precision'], label='Data Points')
+    Args:
+    - phase_times (pd.DataFrame): Mean phase times per method, as returned by `compute_phase_times`.
+    """
+    phase_times.plot.bar(stacked=True, ax=plt.figure(figsize=(10, 6)).gca())
+
+    plt.title('Mean Time per Phase')
+    plt.xlabel('Method')
+    plt.ylabel('Time (ms)')
+    plt.legend(title='Phase')
+    plt.tight_layout()
 
-        plt.title(f'Scatter Plot for Method: {method}')
-        plt.xlabel('Iterations')
-        plt.ylabel('Precision')
-        plt.legend()
-        plt.savefig(f'images/Plots{index}')
-        plt.show()
+
+def plot_phase_bars(df: pd.DataFrame, workers: Optional[int] = None, show: bool = False) -> None:
+    """
+    Plot the phase breakdown of the time of each method. Result files written before the phases were recorded have no
+    phase columns and are skipped.
+
+    Args:
+    - df (pd.DataFrame): The DataFrame containing optimization results.
+    - workers (Optional[int]): Number of rendering processes; None uses every CPU core.
+    - show (bool): Show every figure interactively instead of rendering them headless.
+    """
+    if set(PHASE_COLUMNS).issubset(df.columns):
+        render_figures([FigureJob('images/PhaseTimes.png', draw_phase_bars, compute_phase_times(df))], workers, show)
 
 
-def main(file_path: str) -> None:
+def main(file_path: str, workers: Optional[int] = None, show: bool = False) -> None:
     """
-    Main function to read CSV, compute correlations, plot scatter plots, and print correlations.
+    Main function to read the results, compute correlations, plot scatter plots and phase times, and print
+    correlations.
 
     Args:
-    - file_path (str): Path to the CSV file.
+    - file_path (str): Path to the result file.
+    - workers (Optional[int]): Number of rendering processes; None uses every CPU core.
+    - show (bool): Show every figure interactively instead of rendering them headless.
     """
     df = read_and_filter_csv(file_path)
     correlations = compute_correlations(df)
-    plot_scatter_plots(df)
+    plot_scatter_plots(df, workers, show)
+    plot_phase_bars(df, workers, show)
 
     for method, correlation in correlations.items():
         print(f'Method: {method}, Correlation: {correlation}')
 
 
 if __name__ == '__main__':
-    main('optimization_results2.csv')
+    main('optimization_results2.npy')
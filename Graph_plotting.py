@@ -1,112 +1,151 @@
-import pandas as pd
+import math
 import matplotlib.pyplot as plt
+from columnar_results import read_results
+from figure_rendering import FigureJob, render_figures
+from instrumentation import read_trace
+from result_summary import FUNCTION_TYPES, average_times, summarize
 
 def read_and_process_data(filename):
-    """Reads data from a CSV file."""
-    return pd.read_csv(filename)
+    """Reads data from a columnar result file (memory-mapped) or a CSV file."""
+    return read_results(filename)
 
-def compute_average_times(data, function_types):
-    """Computes average times for each method, function type, and precision."""
-    avg_results = {}
-    for precision, precision_data in data.groupby('Precision'):
-        avg_results[precision] = {}
-        for method_name, method_data in precision_data.groupby('Method'):
-            avg_results[precision][method_name] = {
-                function_type: method_data[method_data['Function Name'].str.startswith(function_type)]['Time'].mean()
-                for function_type in function_types
-            }
-    return avg_results
-
-def plot_results(avg_results_by_function, function_types, title_prefix, file_prefix):
-    """Plots bar charts for each precision and combined."""
-    for precision, results in avg_results_by_function.items():
-        df = pd.DataFrame(results).fillna(0)
-        df.plot(kind='bar', figsize=(10, 6))
-        plt.title(f'{title_prefix} - Precision {precision}')
-        plt.xlabel('Function Type')
-        plt.ylabel('Average Time')
-        plt.xticks(rotation=45)
-        plt.legend(title='Method')
-        plt.tight_layout()
-        plt.savefig(f"images/{file_prefix}_{precision}.png")
-        plt.show()
-
-    # Combine all precision results
-    combined_results = {method: pd.DataFrame().from_dict({precision: data[method] for precision, data in avg_results_by_function.items()}).mean(axis=1) for method in avg_results_by_function[list(avg_results_by_function.keys())[0]].keys()}
-    pd.DataFrame(combined_results).plot(kind='bar', figsize=(10, 6))
-    plt.title(f'{title_prefix} - All Precisions Combined')
+def draw_average_times(results, title):
+    """Draws a bar chart of the average time of every method by function type."""
+    results.plot(kind='bar', figsize=(10, 6))
+    plt.title(title)
     plt.xlabel('Function Type')
     plt.ylabel('Average Time')
     plt.xticks(rotation=45)
     plt.legend(title='Method')
     plt.tight_layout()
-    plt.savefig(f"images/{file_prefix}_combined.png")
-    plt.show()
 
-def load_and_plot_histograms(data, file_prefix):
-    """Loads data and plots histograms for each method by precision and combined."""
-    for precision, precision_data in data.groupby('Precision'):
-        methods = precision_data['Method'].unique()
-        plt.figure(figsize=(12, 6))
-        for i, method in enumerate(methods, 1):
-            plt.subplot(2, 3, i)
-            plt.hist(precision_data[precision_data['Method'] == method]['Time'], bins=10, edgecolor='black')
-            plt.title(f"{method} - Precision {precision}")
-            plt.xlabel("Time")
-            plt.ylabel("Frequency")
-        plt.tight_layout()
-        plt.savefig(f"images/{file_prefix}_histograms_{precision}.png")
-        plt.show()
+def results_figures(summary, function_types, title_prefix, file_prefix):
+    """Returns the bar charts for each precision and combined, from the table built by `result_summary.summarize`."""
+    jobs = [FigureJob(f"images/{file_prefix}_{precision}.png", draw_average_times,
+                      average_times(summary, precision).reindex(function_types).fillna(0),
+                      (f'{title_prefix} - Precision {precision}',))
+            for precision in summary['Precision'].unique()]
 
-    # Combine all precision data for histograms
-    plt.figure(figsize=(12, 6))
+    # Combine all precision results
+    jobs.append(FigureJob(f"images/{file_prefix}_combined.png", draw_average_times,
+                          average_times(summary).reindex(function_types),
+                          (f'{title_prefix} - All Precisions Combined',)))
+    return jobs
+
+def plot_results(summary, function_types, title_prefix, file_prefix, show=False):
+    """Plots bar charts for each precision and combined."""
+    render_figures(results_figures(summary, function_types, title_prefix, file_prefix), show=show)
+
+def draw_histograms(data, methods, precision):
+    """Draws a grid with the histogram of the times of every method at one precision."""
+    rows = math.ceil(len(methods) / 3)
+    plt.figure(figsize=(12, 3 * rows))
+    for i, method in enumerate(methods, 1):
+        plt.subplot(rows, 3, i)
+        plt.hist(data[data['Method'] == method]['Time'], bins=10, edgecolor='black')
+        plt.title(f"{method} - Precision {precision}")
+        plt.xlabel("Time")
+        plt.ylabel("Frequency")
+    plt.tight_layout()
+
+def draw_combined_histograms(data, methods):
+    """Draws a grid with the histogram of the times of every method, stacked by precision."""
+    rows = math.ceil(len(methods) / 3)
+    plt.figure(figsize=(12, 3 * rows))
     for i, method in enumerate(methods, 1):
         combined_data = [data[data['Method'] == method]['Time'] for precision, data in data.groupby('Precision')]
-        plt.subplot(2, 3, i)
+        plt.subplot(rows, 3, i)
         plt.hist(combined_data, bins=10, edgecolor='black', stacked=True)
         plt.title(f"{method} - Combined")
         plt.xlabel("Time")
         plt.ylabel("Frequency")
     plt.tight_layout()
-    plt.savefig(f"images/{file_prefix}_histograms_combined.png")
-    plt.show()
 
-def plot_boxplots(data, file_prefix):
-    """Plots boxplots for each method by precision and combined."""
+def histogram_figures(data, file_prefix):
+    """Returns the histograms for each method by precision and combined."""
+    data = data[['Precision', 'Method', 'Time']]
+    jobs = []
     for precision, precision_data in data.groupby('Precision'):
-        plt.figure(figsize=(10, 6))
-        precision_data.boxplot(by='Method', column='Time', grid=False)
-        plt.title(f"Boxplots by Method - Precision {precision}")
-        plt.suptitle('')
-        plt.xlabel("Method")
-        plt.ylabel("Time")
-        plt.xticks(rotation=45)
-        plt.tight_layout()
-        plt.savefig(f"images/{file_prefix}_boxplots_{precision}.png")
-        plt.show()
+        methods = list(precision_data['Method'].unique())
+        jobs.append(FigureJob(f"images/{file_prefix}_histograms_{precision}.png", draw_histograms, precision_data,
+                              (methods, precision)))
 
-    # Combined boxplots
+    # Combine all precision data for histograms
+    jobs.append(FigureJob(f"images/{file_prefix}_histograms_combined.png", draw_combined_histograms, data, (methods,)))
+    return jobs
+
+def load_and_plot_histograms(data, file_prefix, show=False):
+    """Loads data and plots histograms for each method by precision and combined."""
+    render_figures(histogram_figures(data, file_prefix), show=show)
+
+def draw_boxplots(data, title):
+    """Draws the boxplots of the times of every method."""
     plt.figure(figsize=(10, 6))
     data.boxplot(by='Method', column='Time', grid=False)
-    plt.title("Boxplots by Method - All Precisions Combined")
+    plt.title(title)
     plt.suptitle('')
     plt.xlabel("Method")
     plt.ylabel("Time")
     plt.xticks(rotation=45)
     plt.tight_layout()
-    plt.savefig(f"images/{file_prefix}_boxplots_combined.png")
-    plt.show()
 
-def main():
-    function_types = ['Quadratic', 'Cubic', 'Quartic', 'Exponential', 'Logarithmic']
-    optimization_data = read_and_process_data('optimization_results2.csv')
-    optimization_data = optimization_data[optimization_data['Result'] == 'Success']  # Filter successful optimizations
+def boxplot_figures(data, file_prefix):
+    """Returns the boxplots for each method by precision and combined."""
+    data = data[['Precision', 'Method', 'Time']]
+    jobs = [FigureJob(f"images/{file_prefix}_boxplots_{precision}.png", draw_boxplots, precision_data,
+                      (f"Boxplots by Method - Precision {precision}",))
+            for precision, precision_data in data.groupby('Precision')]
+
+    # Combined boxplots
+    jobs.append(FigureJob(f"images/{file_prefix}_boxplots_combined.png", draw_boxplots, data,
+                          ("Boxplots by Method - All Precisions Combined",)))
+    return jobs
+
+def plot_boxplots(data, file_prefix, show=False):
+    """Plots boxplots for each method by precision and combined."""
+    render_figures(boxplot_figures(data, file_prefix), show=show)
+
+def draw_convergence(trace, title):
+    """
+    Draws, for every traced run, the distance of f(x) to the best value of the run and the width of the region still
+    searched (the size of the step for the methods without one) against the iteration, both on a log scale.
+    """
+    fig, (value_axis, width_axis) = plt.subplots(1, 2, figsize=(12, 5))
+    for (run, method), run_trace in trace.groupby(['run', 'method'], sort=False):
+        label = f"{method} ({run})"
+        error = run_trace['f'] - run_trace['f'].min()
+        value_axis.semilogy(run_trace['iteration'], error.where(error > 0), marker='.', label=label)
+        width = run_trace['width'].fillna(run_trace['step'].abs())
+        width_axis.semilogy(run_trace['iteration'], width.where(width > 0), marker='.', label=label)
+    value_axis.set_title('f(x) - best f(x)')
+    width_axis.set_title('Bracket width / step')
+    for axis in (value_axis, width_axis):
+        axis.set_xlabel('Iteration')
+    width_axis.legend()
+    fig.suptitle(title)
+    plt.tight_layout()
+
+def convergence_figures(trace, file_prefix):
+    """Returns the convergence plot of a trace recorded with `instrumentation.record_trace`."""
+    return [FigureJob(f"images/{file_prefix}_convergence.png", draw_convergence, trace, ('Convergence',))]
+
+def plot_convergence(trace_path, file_prefix='trace', show=False):
+    """Plots the convergence of the runs in a trace file saved by `TraceRecorder.save` (.npy or .csv)."""
+    render_figures(convergence_figures(read_trace(trace_path), file_prefix), show=show)
 
-    avg_results_by_function = compute_average_times(optimization_data, function_types)
-    plot_results(avg_results_by_function, function_types, 'Optimization Method Comparison', 'optimization_plots')
+def main(filename='optimization_results2.npy', workers=None, show=False, trace_path=None):
+    all_data = read_and_process_data(filename)
+    summary = summarize(all_data, FUNCTION_TYPES)
+    optimization_data = all_data[all_data['Result'] == 'Success']  # Filter successful optimizations
 
-    load_and_plot_histograms(optimization_data, 'optimization_data')
-    plot_boxplots(optimization_data, 'optimization_data')
+    # All figures are rendered together, so that they share one process pool
+    jobs = (results_figures(summary, FUNCTION_TYPES, 'Optimization Method Comparison', 'optimization_plots')
+            + histogram_figures(optimization_data, 'optimization_data')
+            + boxplot_figures(optimization_data, 'optimization_data'))
+    if trace_path is not None:
+        jobs += convergence_figures(read_trace(trace_path), 'trace')
+    rendered = render_figures(jobs, workers, show)
+    print(f"Rendered {rendered} of {len(jobs)} figures")
 
 if __name__ == "__main__":
     main()
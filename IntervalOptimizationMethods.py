@@ -1,18 +1,23 @@
+import math
 import numpy as np
-from typing import Callable, Tuple, Union
-import sympy as sp
+from typing import Callable, Optional, Sequence, Tuple, Union
+from function_cache import MemoizedFunction, compile_function, evaluate_array
+from instrumentation import phase_timer, timed_phases, trace_run
 
 
 class IntervalOptimizationMethods:
     """
     A class that provides various methods for optimizing a function over a specified interval. These methods are designed
-    to find the local minimum of a function within given bounds. The class implements three different interval optimization
-    techniques: Golden Ratio Optimization, Fibonacci Search, and Bisection Method.
+    to find the local minimum of a function within given bounds. The class implements five different interval optimization
+    techniques: Golden Ratio Optimization, Fibonacci Search, Bisection Method, Brent's Method and a Global Multistart
+    Search.
     """
 
     @staticmethod
+    @timed_phases
     def golden_ratio_optimization(func: Callable[[float], float], lower_bound: float, upper_bound: float,
-                                  tolerance: float = 1e-6) -> Tuple[float, float, int, str]:
+                                  tolerance: float = 1e-6, bracket: bool = False, x0: Optional[float] = None,
+                                  bracket_step: Optional[float] = None) -> Tuple[float, float, int, str]:
         """
         Implements the Golden Ratio Optimization method to find the minimum of a unimodal function within a specified
         interval.
@@ -23,45 +28,63 @@ class IntervalOptimizationMethods:
         - upper_bound (float): The upper boundary of the search interval.
         - tolerance (float): The precision tolerance of the search, defining how close the interval endpoints must be
         to conclude the search.
+        - bracket (bool): Start from the bracket found by `find_bracket` instead of the whole interval.
+        - x0 (Optional[float]): A starting point for `find_bracket`, as for the point methods; implies `bracket`, and
+        the bounds may then be None.
+        - bracket_step (Optional[float]): The first step of `find_bracket`; by default 1/32 of the interval, or 1
+        without bounds. A start known to lie close to the minimum brackets it sooner with a smaller step.
 
         Returns:
         Tuple[float, float, int, str]: A tuple containing the estimated x-value at the minimum, the minimum value of the
-         function at that x-value, the number of iterations performed, and the result status ("Success" or "Failure").
+         function at that x-value, the number of iterations performed (bracketing steps included), and the result
+         status ("Success" or "Failure").
         """
-        x = sp.symbols("x")
         # Golden ratio constant
         golden_ratio = (np.sqrt(5) - 1) / 2
 
-        f = sp.lambdify(x, func, 'numpy')
-        a_init = lower_bound
-        b_init = upper_bound
+        f = MemoizedFunction(compile_function(func))
+        record = trace_run('golden_ratio_optimization')
+        phases = phase_timer()
+        if phases is not None:
+            phases.mark('Compile')
+        lower_bound, upper_bound, a_init, b_init, iterations = IntervalOptimizationMethods._search_interval(
+            f, lower_bound, upper_bound, bracket, x0, bracket_step)
         # Initial points
         x1 = lower_bound + (1 - golden_ratio) * (upper_bound - lower_bound)
         x2 = lower_bound + golden_ratio * (upper_bound - lower_bound)
+        f_x1 = f(x1)
+        f_x2 = f(x2)
 
-        iterations = 0
         while abs(upper_bound - lower_bound) > tolerance:
             iterations += 1
-            # Calculate function values at x1 and x2
-            f_x1 = f(x1)
-            f_x2 = f(x2)
 
-            # Choose the new interval
+            # Choose the new interval; the surviving inner point keeps its function value, so only the new point is
+            # evaluated
             if f_x1 < f_x2:
                 upper_bound = x2
                 x2 = x1
+                f_x2 = f_x1
                 x1 = lower_bound + (1 - golden_ratio) * (upper_bound - lower_bound)
+                f_x1 = f(x1)
             else:
                 lower_bound = x1
                 x1 = x2
+                f_x1 = f_x2
                 x2 = lower_bound + golden_ratio * (upper_bound - lower_bound)
+                f_x2 = f(x2)
+
+            if record is not None:
+                x, f_x = (x1, f_x1) if f_x1 < f_x2 else (x2, f_x2)
+                record(x, f_x, upper_bound - lower_bound)
 
+        if phases is not None:
+            phases.mark('Iteration')
         # Return the midpoint of the final interval
         x_min = (lower_bound + upper_bound) / 2
         best_function_value = f(x_min)
 
         # Check if optimization is at a boundary
-        if np.isclose(x_min, a_init, atol=tolerance) or np.isclose(x_min, b_init, atol=tolerance):
+        if IntervalOptimizationMethods.is_boundary_minimum(x_min, a_init, b_init, tolerance):
             result_status = "Failure"
         else:
             result_status = "Success"
@@ -69,9 +92,11 @@ class IntervalOptimizationMethods:
         return x_min, best_function_value, iterations, result_status
 
     @staticmethod
+    @timed_phases
     def fibonacci_optimization(func: Callable[[float], float], lower_bound: float, upper_bound: float,
-                               tolerance: float = 1e-6, n: int = 100) -> Tuple[
-        Union[float, None], Union[float, None], int, str]:
+                               tolerance: float = 1e-6, n: int = 100, bracket: bool = False,
+                               x0: Optional[float] = None, bracket_step: Optional[float] = None) -> \
+            Tuple[Union[float, None], Union[float, None], int, str]:
         """
         Utilizes Fibonacci numbers to determine the minimum of a function within an interval by progressively narrowing
          the range of search.
@@ -83,14 +108,24 @@ class IntervalOptimizationMethods:
         - tolerance (float): The convergence tolerance, defining the precision of the search.
         - n (int): The number of Fibonacci iterations to perform. This defines the number of steps the interval is
          reduced in.
+        - bracket (bool): Start from the bracket found by `find_bracket` instead of the whole interval.
+        - x0 (Optional[float]): A starting point for `find_bracket`, as for the point methods; implies `bracket`, and
+        the bounds may then be None.
+        - bracket_step (Optional[float]): The first step of `find_bracket`; by default 1/32 of the interval, or 1
+        without bounds. A start known to lie close to the minimum brackets it sooner with a smaller step.
 
         Returns:
         Tuple[Union[float, None], Union[float, None], int, str]: A tuple containing the estimated x-value at the
-         minimum, the minimum value of the function at that x-value, the number of iterations performed,
-         and the result status ("Success" or "Failure").
+         minimum, the minimum value of the function at that x-value, the number of iterations performed (bracketing
+         steps included), and the result status ("Success" or "Failure").
         """
-        lower_bound_init = lower_bound
-        upper_bound_init = upper_bound
+        f = MemoizedFunction(compile_function(func))
+        record = trace_run('fibonacci_optimization')
+        phases = phase_timer()
+        if phases is not None:
+            phases.mark('Compile')
+        lower_bound, upper_bound, lower_bound_init, upper_bound_init, bracket_iterations = \
+            IntervalOptimizationMethods._search_interval(f, lower_bound, upper_bound, bracket, x0, bracket_step)
 
         fib = [0, 1]
         for i in range(2, n + 1):
@@ -98,8 +133,6 @@ class IntervalOptimizationMethods:
 
         x1 = lower_bound + (fib[n - 2] / fib[n]) * (upper_bound - lower_bound)
         x2 = lower_bound + (fib[n - 1] / fib[n]) * (upper_bound - lower_bound)
-        x = sp.symbols("x")
-        f = sp.lambdify(x, func, modules='numpy')
         f1 = f(x1)
         f2 = f(x2)
 
@@ -119,20 +152,212 @@ class IntervalOptimizationMethods:
                 x2 = lower_bound + (fib[n - iterations - 1] / fib[n - iterations]) * (upper_bound - lower_bound)
                 f2 = f(x2)
 
+            if record is not None:
+                x, f_x = (x1, f1) if f1 < f2 else (x2, f2)
+                record(x, f_x, upper_bound - lower_bound)
+
+        if phases is not None:
+            phases.mark('Iteration')
         x_min = (x1 + x2) / 2
         minimum = f(x_min)
 
         # Check if optimization is at a boundary
-        if np.isclose(x_min, lower_bound_init, atol=tolerance) or np.isclose(x_min, upper_bound_init, atol=tolerance):
+        if IntervalOptimizationMethods.is_boundary_minimum(x_min, lower_bound_init, upper_bound_init, tolerance):
             result_status = "Failure"
         else:
             result_status = "Success"
 
+        return x_min, minimum, bracket_iterations + iterations, result_status
+
+    @staticmethod
+    @timed_phases
+    def batch_golden_ratio_optimization(func: Union[Callable[[float], float], Sequence[Callable[[float], float]]],
+                                        lower_bounds: np.ndarray, upper_bounds: np.ndarray,
+                                        tolerance: float = 1e-6) -> Tuple[np.ndarray, np.ndarray, np.ndarray,
+                                                                          np.ndarray]:
+        """
+        Vectorized Golden Ratio Optimization that narrows many intervals ("lanes") in lockstep. Each lane follows the
+        same rules as `golden_ratio_optimization`; lanes whose interval is already narrower than the tolerance are
+        frozen with `np.where` while the others keep shrinking.
+
+        Parameters:
+        - func (Callable[[float], float] or a sequence of them): The function to minimize, or one function per lane.
+        - lower_bounds (np.ndarray): The lower boundaries of the search intervals.
+        - upper_bounds (np.ndarray): The upper boundaries of the search intervals.
+        - tolerance (float): The precision tolerance of the search, defining how close the interval endpoints must be
+        to conclude the search.
+
+        Returns:
+        Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]: Arrays of the estimated x-values at the minimum, the
+        function values at those x-values, the number of iterations performed by each lane, and the result status of
+        each lane ("Failure" when the minimum lies on the boundary of the initial interval).
+        """
+        golden_ratio = (np.sqrt(5) - 1) / 2
+
+        f, lower_bound, upper_bound = IntervalOptimizationMethods._batch_lanes(func, lower_bounds, upper_bounds)
+        phases = phase_timer()
+        if phases is not None:
+            phases.mark('Compile')
+        a_init = lower_bound.copy()
+        b_init = upper_bound.copy()
+        x1 = lower_bound + (1 - golden_ratio) * (upper_bound - lower_bound)
+        x2 = lower_bound + golden_ratio * (upper_bound - lower_bound)
+        f_x1 = f(x1)
+        f_x2 = f(x2)
+
+        iterations = np.zeros(lower_bound.shape, dtype=int)
+        active = np.abs(upper_bound - lower_bound) > tolerance
+        while active.any():
+            iterations += active
+            keep_left = active & (f_x1 < f_x2)
+            keep_right = active & ~(f_x1 < f_x2)
+
+            upper_bound = np.where(keep_left, x2, upper_bound)
+            lower_bound = np.where(keep_right, x1, lower_bound)
+            # The surviving inner point is reused, so each lane needs a single new evaluation per iteration
+            x2, f_x2, x1, f_x1 = (np.where(keep_left, x1, x2), np.where(keep_left, f_x1, f_x2),
+                                  np.where(keep_right, x2, x1), np.where(keep_right, f_x2, f_x1))
+            x1 = np.where(keep_left, lower_bound + (1 - golden_ratio) * (upper_bound - lower_bound), x1)
+            x2 = np.where(keep_right, lower_bound + golden_ratio * (upper_bound - lower_bound), x2)
+            f_new = f(np.where(keep_left, x1, x2))
+            f_x1 = np.where(keep_left, f_new, f_x1)
+            f_x2 = np.where(keep_right, f_new, f_x2)
+
+            active = np.abs(upper_bound - lower_bound) > tolerance
+
+        if phases is not None:
+            phases.mark('Iteration')
+        x_min = (lower_bound + upper_bound) / 2
+        best_function_value = f(x_min)
+        result_status = IntervalOptimizationMethods._batch_status(x_min, a_init, b_init, tolerance)
+
+        return x_min, best_function_value, iterations, result_status
+
+    @staticmethod
+    @timed_phases
+    def batch_fibonacci_optimization(func: Union[Callable[[float], float], Sequence[Callable[[float], float]]],
+                                     lower_bounds: np.ndarray, upper_bounds: np.ndarray, tolerance: float = 1e-6,
+                                     n: int = 100) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Vectorized Fibonacci search that narrows many intervals ("lanes") in lockstep. Each lane follows the same rules
+        as `fibonacci_optimization`; since every active lane has performed the same number of steps, all of them share
+        the Fibonacci ratio of the current step.
+
+        Parameters:
+        - func (Callable[[float], float] or a sequence of them): The function to minimize, or one function per lane.
+        - lower_bounds (np.ndarray): The starts of the intervals.
+        - upper_bounds (np.ndarray): The ends of the intervals.
+        - tolerance (float): The convergence tolerance, defining the precision of the search.
+        - n (int): The number of Fibonacci iterations to perform.
+
+        Returns:
+        Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]: Arrays of the estimated x-values at the minimum, the
+        function values at those x-values, the number of iterations performed by each lane, and the result status of
+        each lane ("Failure" when the minimum lies on the boundary of the initial interval).
+        """
+        f, lower_bound, upper_bound = IntervalOptimizationMethods._batch_lanes(func, lower_bounds, upper_bounds)
+        phases = phase_timer()
+        if phases is not None:
+            phases.mark('Compile')
+        lower_bound_init = lower_bound.copy()
+        upper_bound_init = upper_bound.copy()
+
+        fib = [0, 1]
+        for i in range(2, n + 1):
+            fib.append(fib[-1] + fib[-2])
+
+        x1 = lower_bound + (fib[n - 2] / fib[n]) * (upper_bound - lower_bound)
+        x2 = lower_bound + (fib[n - 1] / fib[n]) * (upper_bound - lower_bound)
+        f1 = f(x1)
+        f2 = f(x2)
+
+        iterations = np.zeros(lower_bound.shape, dtype=int)
+        step = 0
+        active = np.abs(upper_bound - lower_bound) > tolerance
+        while active.any() and step < n - 2:
+            step += 1
+            iterations += active
+            keep_left = active & (f1 < f2)
+            keep_right = active & ~(f1 < f2)
+
+            upper_bound = np.where(keep_left, x2, upper_bound)
+            lower_bound = np.where(keep_right, x1, lower_bound)
+            x2, f2, x1, f1 = (np.where(keep_left, x1, x2), np.where(keep_left, f1, f2),
+                              np.where(keep_right, x2, x1), np.where(keep_right, f2, f1))
+            x1 = np.where(keep_left, lower_bound + (fib[n - step - 2] / fib[n - step]) * (upper_bound - lower_bound),
+                          x1)
+            x2 = np.where(keep_right, lower_bound + (fib[n - step - 1] / fib[n - step]) * (upper_bound - lower_bound),
+                          x2)
+            f_new = f(np.where(keep_left, x1, x2))
+            f1 = np.where(keep_left, f_new, f1)
+            f2 = np.where(keep_right, f_new, f2)
+
+            active = np.abs(upper_bound - lower_bound) > tolerance
+
+        if phases is not None:
+            phases.mark('Iteration')
+        x_min = (x1 + x2) / 2
+        minimum = f(x_min)
+        result_status = IntervalOptimizationMethods._batch_status(x_min, lower_bound_init, upper_bound_init, tolerance)
+
         return x_min, minimum, iterations, result_status
 
     @staticmethod
+    def _batch_lanes(func, lower_bounds, upper_bounds) -> Tuple[Callable[[np.ndarray], np.ndarray], np.ndarray,
+                                                                np.ndarray]:
+        """
+        Broadcasts the bounds (and the optional stack of functions) to a common 1-D set of lanes and returns an
+        evaluator that computes the objective of every lane in a single call per distinct function.
+        """
+        functions = list(func) if isinstance(func, (list, tuple)) else None
+        lane_count = np.broadcast(np.empty(len(functions) if functions else 1), np.asarray(lower_bounds),
+                                  np.asarray(upper_bounds)).size
+        lower_bound = np.broadcast_to(np.asarray(lower_bounds, dtype=float).ravel(), (lane_count,)).copy()
+        upper_bound = np.broadcast_to(np.asarray(upper_bounds, dtype=float).ravel(), (lane_count,)).copy()
+
+        if functions is None:
+            f = compile_function(func)
+            return (lambda x: evaluate_array(f, x)), lower_bound, upper_bound
+
+        lanes_by_function = {}
+        for lane, expr in enumerate(np.broadcast_to(np.array(functions, dtype=object), (lane_count,))):
+            lanes_by_function.setdefault(expr, []).append(lane)
+        groups = [(compile_function(expr), np.array(lanes)) for expr, lanes in lanes_by_function.items()]
+
+        def evaluate(x: np.ndarray) -> np.ndarray:
+            values = np.empty(x.shape)
+            for f, lanes in groups:
+                values[lanes] = evaluate_array(f, x[lanes])
+            return values
+
+        return evaluate, lower_bound, upper_bound
+
+    @staticmethod
+    def is_boundary_minimum(x: float, lower_bound: float, upper_bound: float, tolerance: float) -> bool:
+        """
+        The boundary rule of the interval methods: whether x lies within the tolerance of either bound, compared as by
+        `np.isclose(x, bound, atol=tolerance)` but on plain floats, which costs far less than the NumPy call for the
+        single point a method returns.
+        """
+        for bound in (lower_bound, upper_bound):
+            if x == bound or (math.isfinite(bound) and abs(x - bound) <= tolerance + 1e-05 * abs(bound)):
+                return True
+        return False
+
+    @staticmethod
+    def _batch_status(x_min: np.ndarray, lower_bound_init: np.ndarray, upper_bound_init: np.ndarray,
+                      tolerance: float) -> np.ndarray:
+        """Marks the lanes whose minimum lies on the boundary of the initial interval as "Failure"."""
+        at_boundary = (np.isclose(x_min, lower_bound_init, atol=tolerance)
+                       | np.isclose(x_min, upper_bound_init, atol=tolerance))
+        return np.where(at_boundary, "Failure", "Success")
+
+    @staticmethod
+    @timed_phases
     def bisection_optimization(func: Callable[[float], float], lower_bound: float, upper_bound: float,
-                               delta: float = 0.1, tolerance: float = 1e-6) -> Tuple[float, float, int, str]:
+                               delta: float = 0.1, tolerance: float = 1e-6, bracket: bool = False,
+                               x0: Optional[float] = None, bracket_step: Optional[float] = None) -> \
+            Tuple[float, float, int, str]:
         """
         The Bisection method is used to find the minimum of a function by evaluating the function at the midpoint and
         points slightly left and right of the midpoint, then narrowing the search interval based on these evaluations.
@@ -145,31 +370,334 @@ class IntervalOptimizationMethods:
         the interval reduction.
         - tolerance (float): The precision tolerance of the convergence, defining how close the interval endpoints must
         be to conclude the search.
+        - bracket (bool): Start from the bracket found by `find_bracket` instead of the whole interval.
+        - x0 (Optional[float]): A starting point for `find_bracket`, as for the point methods; implies `bracket`, and
+        the bounds may then be None.
+        - bracket_step (Optional[float]): The first step of `find_bracket`; by default 1/32 of the interval, or 1
+        without bounds. A start known to lie close to the minimum brackets it sooner with a smaller step.
 
         Returns:
         Tuple[float, float, int, str]: A tuple containing the x-value of the minimum, the minimum value of the function
-        at that x-value, the number of iterations, and the result status ("Success" or "Failure").
+        at that x-value, the number of iterations (bracketing steps included), and the result status ("Success" or
+        "Failure").
         """
-        lower_bound_init = lower_bound
-        upper_bound_init = upper_bound
-        x = sp.symbols('x')
-        f = sp.lambdify(x, func, modules='numpy')
-        iterations = 0
+        # The probes never repeat a point, so unlike the section searches the function is not memoized
+        f = compile_function(func)
+        record = trace_run('bisection_optimization')
+        phases = phase_timer()
+        if phases is not None:
+            phases.mark('Compile')
+        lower_bound, upper_bound, lower_bound_init, upper_bound_init, iterations = \
+            IntervalOptimizationMethods._search_interval(f, lower_bound, upper_bound, bracket, x0, bracket_step)
         while abs(lower_bound - upper_bound) > tolerance:
             mid = (lower_bound + upper_bound) / 2
             left = mid - delta
             right = mid + delta
-            if f(left) < f(right):
+            f_left = f(left)
+            f_right = f(right)
+            if f_left < f_right:
                 upper_bound = mid
             else:
                 lower_bound = mid
             iterations += 1
 
+            if record is not None:
+                x, f_x = (left, f_left) if f_left < f_right else (right, f_right)
+                record(x, f_x, upper_bound - lower_bound)
+
+        if phases is not None:
+            phases.mark('Iteration')
         x_min = (lower_bound + upper_bound) / 2
         minimum = f(x_min)
-        if np.isclose(x_min, lower_bound_init, atol=tolerance) or np.isclose(x_min, upper_bound_init, atol=tolerance):
+        if IntervalOptimizationMethods.is_boundary_minimum(x_min, lower_bound_init, upper_bound_init, tolerance):
             result_status = "Failure"
         else:
             result_status = "Success"
 
         return x_min, minimum, iterations, result_status
+
+    @staticmethod
+    @timed_phases
+    def brent_optimization(func: Callable[[float], float], lower_bound: float, upper_bound: float,
+                           tolerance: float = 1e-6, max_iterations: int = 500) -> Tuple[float, float, int, str]:
+        """
+        Brent's method combines parabolic interpolation through the three best points found so far with golden section
+        steps as a safeguard. On smooth functions the parabolic steps converge superlinearly, while the golden section
+        fallback keeps the worst case close to the golden ratio method.
+
+        Parameters:
+        - func (Callable[[float], float]): The function to minimize.
+        - lower_bound (float): The lower boundary of the search interval.
+        - upper_bound (float): The upper boundary of the search interval.
+        - tolerance (float): The precision tolerance of the search; the search stops when the interval around the best
+        point is narrower than this value (plus a relative term of the order of the square root of machine epsilon).
+        - max_iterations (int): The maximum number of iterations to perform.
+
+        Returns:
+        Tuple[float, float, int, str]: A tuple containing the estimated x-value at the minimum, the minimum value of the
+         function at that x-value, the number of iterations performed, and the result status ("Success" or "Failure").
+        """
+        # Golden section fraction (3 - sqrt(5)) / 2 and the square root of machine epsilon
+        golden_section = (3 - np.sqrt(5)) / 2
+        sqrt_epsilon = np.sqrt(np.finfo(float).eps)
+
+        f = compile_function(func)
+        record = trace_run('brent_optimization')
+        phases = phase_timer()
+        if phases is not None:
+            phases.mark('Compile')
+        # Reversed bounds are swapped, as in the other interval searches (see `_search_interval`)
+        lower_bound, upper_bound = min(lower_bound, upper_bound), max(lower_bound, upper_bound)
+        lower_bound_init = lower_bound
+        upper_bound_init = upper_bound
+        # x is the best point so far, w the second best and v the previous value of w
+        x = w = v = lower_bound + golden_section * (upper_bound - lower_bound)
+        f_x = f_w = f_v = f(x)
+        step = previous_step = 0.0
+
+        iterations = 0
+        while iterations < max_iterations:
+            midpoint = (lower_bound + upper_bound) / 2
+            tolerance1 = sqrt_epsilon * abs(x) + tolerance / 4
+            tolerance2 = 2 * tolerance1
+            if abs(x - midpoint) <= tolerance2 - (upper_bound - lower_bound) / 2:
+                break
+            iterations += 1
+
+            use_golden_section = True
+            if abs(previous_step) > tolerance1:
+                # Parabola through x, w and v
+                r = (x - w) * (f_x - f_v)
+                q = (x - v) * (f_x - f_w)
+                p = (x - v) * q - (x - w) * r
+                q = 2 * (q - r)
+                if q > 0:
+                    p = -p
+                q = abs(q)
+                step_before_last = previous_step
+                previous_step = step
+                # Accept the parabolic step only if it falls inside the interval and moves less than half of the step
+                # before last, otherwise fall back to golden section
+                if abs(p) < abs(q * step_before_last / 2) and q * (lower_bound - x) < p < q * (upper_bound - x):
+                    step = p / q
+                    u = x + step
+                    if u - lower_bound < tolerance2 or upper_bound - u < tolerance2:
+                        step = tolerance1 if x < midpoint else -tolerance1
+                    use_golden_section = False
+            if use_golden_section:
+                previous_step = (upper_bound - x) if x < midpoint else (lower_bound - x)
+                step = golden_section * previous_step
+
+            # Never evaluate closer than tolerance1 to the best point
+            u = x + step if abs(step) >= tolerance1 else x + np.copysign(tolerance1, step)
+            f_u = f(u)
+
+            # A finite value always replaces a NaN best point (a start outside the function's domain)
+            if f_u <= f_x or (np.isnan(f_x) and not np.isnan(f_u)):
+                if u < x:
+                    upper_bound = x
+                else:
+                    lower_bound = x
+                v, f_v = w, f_w
+                w, f_w = x, f_x
+                x, f_x = u, f_u
+            else:
+                if u < x:
+                    lower_bound = u
+                else:
+                    upper_bound = u
+                if f_u <= f_w or w == x:
+                    v, f_v = w, f_w
+                    w, f_w = u, f_u
+                elif f_u <= f_v or v == x or v == w:
+                    v, f_v = u, f_u
+
+            if record is not None:
+                record(x, f_x, upper_bound - lower_bound)
+
+        if phases is not None:
+            phases.mark('Iteration')
+        if IntervalOptimizationMethods.is_boundary_minimum(x, lower_bound_init, upper_bound_init, tolerance):
+            result_status = "Failure"
+        else:
+            result_status = "Success"
+
+        return x, f_x, iterations, result_status
+
+    @staticmethod
+    @timed_phases
+    def global_optimization(func: Callable[[float], float], lower_bound: float, upper_bound: float,
+                            tolerance: float = 1e-6, grid_points: int = 1000, return_local_minima: bool = True) -> \
+            Union[Tuple[float, float, int, str], Tuple[float, float, int, str, np.ndarray]]:
+        """
+        Multistart search for the global minimum over an interval. The function is evaluated on a uniform grid in one
+        vectorized call, every grid point where the discrete slope changes from negative to non-negative starts a basin,
+        and all basins are refined together by `batch_golden_ratio_optimization` on the bracket formed by their two
+        neighbouring grid points. The global minimum is the lowest of these local minima and of the two endpoints, so
+        unlike the single-start methods the search does not converge to an endpoint when the interval holds several
+        local minima, and it returns an endpoint (as a "Failure") whenever the function is lowest there.
+
+        Parameters:
+        - func (Callable[[float], float]): The function to minimize.
+        - lower_bound (float): The lower boundary of the search interval.
+        - upper_bound (float): The upper boundary of the search interval.
+        - tolerance (float): The precision tolerance of the refinement of every basin.
+        - grid_points (int): The number of grid points; basins narrower than the grid spacing can be missed.
+        - return_local_minima (bool): Whether to also return the local minima found.
+
+        Returns:
+        Tuple[float, float, int, str] or Tuple[float, float, int, str, np.ndarray]: A tuple containing the x-value of
+         the global minimum, the function value at that x-value, the number of refinement iterations (the grid
+         evaluations only show in the evaluation counts), the result status ("Failure" when the minimum lies on the
+         boundary of the interval, as for the other methods), and optionally an array of the (x, f(x)) rows of all
+         interior local minima, in increasing order of x.
+        """
+        f = compile_function(func)
+        phases = phase_timer()
+        if phases is not None:
+            phases.mark('Compile')
+        grid = np.linspace(lower_bound, upper_bound, grid_points)
+        with np.errstate(all='ignore'):
+            grid_values = evaluate_array(f, grid)
+            # Points outside the function's domain never start a basin
+            slope = np.diff(np.where(np.isnan(grid_values), np.inf, grid_values))
+        basins = np.flatnonzero((slope[:-1] < 0) & (slope[1:] >= 0)) + 1
+
+        iterations = 0
+        local_minima = np.empty((0, 2))
+        if basins.size:
+            with np.errstate(all='ignore'):
+                x_min, f_min, lane_iterations, _ = IntervalOptimizationMethods.batch_golden_ratio_optimization(
+                    func, grid[basins - 1], grid[basins + 1], tolerance)
+            # Keep the grid point when the refinement did not improve on it (e.g. on a flat basin)
+            improved = f_min <= grid_values[basins]
+            local_minima = np.column_stack((np.where(improved, x_min, grid[basins]),
+                                            np.where(improved, f_min, grid_values[basins])))
+            iterations = int(lane_iterations.max())
+
+        if phases is not None:
+            phases.mark('Iteration')
+        # The endpoints come last, so an interior minimum wins a tie with them
+        candidates = np.vstack((local_minima, [[grid[0], grid_values[0]], [grid[-1], grid_values[-1]]]))
+        best = np.argmin(np.where(np.isnan(candidates[:, 1]), np.inf, candidates[:, 1]))
+        x, f_x = float(candidates[best, 0]), float(candidates[best, 1])
+
+        if IntervalOptimizationMethods.is_boundary_minimum(x, lower_bound, upper_bound, tolerance):
+            result_status = "Failure"
+        else:
+            result_status = "Success"
+
+        if return_local_minima:
+            return x, f_x, iterations, result_status, local_minima
+        return x, f_x, iterations, result_status
+
+    @staticmethod
+    @timed_phases
+    def find_bracket(func: Callable[[float], float], lower_bound: Optional[float] = None,
+                     upper_bound: Optional[float] = None, x0: Optional[float] = None, step: Optional[float] = None,
+                     grow: float = (1 + np.sqrt(5)) / 2, max_iterations: int = 50) -> Tuple[float, float, float, int,
+                                                                                              str]:
+        """
+        Searches for a bracket a < b < c with f(b) < f(a) and f(b) < f(c), which holds a local minimum. The search
+        starts with a small step from `x0` and walks downhill with steps growing geometrically by `grow`; a step that
+        lands outside the function's domain (NaN) is contracted geometrically towards the last point instead. Reversed
+        bounds are swapped, and the bracket never leaves the bounds.
+
+        Parameters:
+        - func (Callable[[float], float]): The function to minimize.
+        - lower_bound (Optional[float]): The lower boundary of the search; None leaves it unbounded below.
+        - upper_bound (Optional[float]): The upper boundary of the search; None leaves it unbounded above.
+        - x0 (Optional[float]): The starting point, as for the point methods; by default the midpoint of the bounds.
+        - step (Optional[float]): The first step; by default 1/32 of the interval, or 1 when it is unbounded.
+        - grow (float): The factor the step grows by while the function keeps decreasing.
+        - max_iterations (int): The maximum number of steps.
+
+        Returns:
+        Tuple[float, float, float, int, str]: A tuple containing a, b and c, the number of steps performed, and the
+         result status ("Failure" when no bracket was found, e.g. when the function decreases up to a bound; a and c
+         then span the part of the interval searched last and b is the lowest point found).
+        """
+        f = MemoizedFunction(compile_function(func))
+        phases = phase_timer()
+        if phases is not None:
+            phases.mark('Compile')
+        return IntervalOptimizationMethods._bracket(f, lower_bound, upper_bound, x0, step, grow, max_iterations)
+
+    @staticmethod
+    def _bracket(f: Callable[[float], float], lower_bound: Optional[float], upper_bound: Optional[float],
+                 x0: Optional[float], step: Optional[float] = None, grow: float = (1 + np.sqrt(5)) / 2,
+                 max_iterations: int = 50) -> Tuple[float, float, float, int, str]:
+        """`find_bracket` on an already compiled function, so that its evaluations can be reused afterwards."""
+        # Plain float arithmetic throughout: NumPy calls on scalars would cost more than the function evaluations
+        low = -math.inf if lower_bound is None else lower_bound
+        high = math.inf if upper_bound is None else upper_bound
+        if low > high:
+            low, high = high, low
+        if x0 is None:
+            if not math.isfinite(high - low):
+                raise ValueError("A bracket search needs either both bounds or a starting point x0")
+            x0 = (low + high) / 2
+        if step is None:
+            step = (high - low) / 32 if math.isfinite(high - low) else 1.0
+
+        def value(x):
+            # A point outside the function's domain counts as higher than any other point. NaN is the only value not
+            # equal to itself; unlike math.isnan, this test (and the abs() tests below) also accept the complex results
+            # of real powers of negative numbers (e.g. x ** 0.5)
+            fx = f(x)
+            return math.inf if fx != fx else fx
+
+        a = float(min(max(x0, low), high))
+        b = min(a + step, high)
+        if b == a:
+            b = max(a - step, low)
+        f_a, f_b = value(a), value(b)
+        # Walk downhill from a through b
+        if f_b > f_a:
+            a, f_a, b, f_b = b, f_b, a, f_a
+
+        iterations = 0
+        result_status = "Failure"
+        while iterations < max_iterations:
+            iterations += 1
+            c = float(min(max(b + grow * (b - a), low), high))
+            f_c = value(c)
+            # Contract back towards b while the step lands outside the domain
+            while abs(f_c) == math.inf and abs(f_b) < math.inf and c != b and iterations < max_iterations:
+                iterations += 1
+                c = b + (c - b) / grow
+                f_c = value(c)
+            if f_c > f_b:
+                result_status = "Success"
+                break
+            if c == b:
+                # The walk is stuck at a bound
+                break
+            a, f_a, b, f_b = b, f_b, c, f_c
+
+        a, c = min(a, c), max(a, c)
+        return a, b, c, iterations, result_status
+
+    @staticmethod
+    def _search_interval(f: Callable[[float], float], lower_bound: Optional[float], upper_bound: Optional[float],
+                         bracket: bool, x0: Optional[float],
+                         step: Optional[float] = None) -> Tuple[float, float, float, float, int]:
+        """
+        Returns the interval to search, the interval whose endpoints count as a boundary minimum, and the number of
+        bracketing steps. Without a bracket search this is the interval itself, with reversed bounds swapped. When a
+        bracket was found, the result is still judged against the original bounds. When none was, the function kept
+        decreasing up to a bound (or, without bounds, for every step), so the search collapses onto the lowest point
+        found, which is reported as a boundary minimum; refining a bracket far away from the origin could otherwise
+        never get narrower than a tolerance below the spacing of floats there.
+        """
+        if not bracket and x0 is None:
+            # Reversed bounds are swapped, as the bracket search does
+            if lower_bound is not None and upper_bound is not None and lower_bound > upper_bound:
+                lower_bound, upper_bound = upper_bound, lower_bound
+            return lower_bound, upper_bound, lower_bound, upper_bound, 0
+        a, b, c, iterations, status = IntervalOptimizationMethods._bracket(f, lower_bound, upper_bound, x0, step)
+        if status == "Failure":
+            return b, b, b, b, iterations
+        low, high = sorted((-np.inf if lower_bound is None else lower_bound,
+                            np.inf if upper_bound is None else upper_bound))
+        return a, c, low, high, iterations
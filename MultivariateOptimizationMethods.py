@@ -0,0 +1,117 @@
+import numpy as np
+import scipy.linalg
+import sympy as sp
+from typing import Optional, Sequence, Tuple
+from function_cache import compile_multivariate, ordered_symbols
+from line_search import LINE_SEARCHES
+
+
+class MultivariateOptimizationMethods:
+    """
+    This class contains the n-dimensional versions of the point optimization methods. The gradient and the Hessian are
+    derived symbolically once and compiled into a single NumPy callable of the point vector.
+    """
+
+    @staticmethod
+    def newtons_method(f: sp.Expr, x_k: Sequence[float], tolerance: float = 1e-6, max_iterations: int = 100,
+                       variables: Optional[Sequence[sp.Symbol]] = None) -> Tuple[
+        Optional[np.ndarray], Optional[float], Optional[int], str]:
+        """
+        Newton's method for finding a local minimum of a function of several variables. The Newton step is obtained by
+        solving H p = -g with a Cholesky factorization of the Hessian instead of inverting it.
+
+        Parameters:
+        - f (sp.Expr): The function to be minimized, expressed as a SymPy expression.
+        - x_k (Sequence[float]): Initial guess for the location of the minimum, one component per variable.
+        - tolerance (float): The convergence criterion; the algorithm stops when the norm of the difference between
+        successive iterates is below this value.
+        - max_iterations (int): The maximum number of iterations to execute before stopping.
+        - variables (Sequence[sp.Symbol]): The variables in the order of the components of `x_k`; by default the free
+        symbols of `f` in natural order.
+
+        Returns:
+        Tuple[Optional[np.ndarray], Optional[float], Optional[int], str]: Returns a tuple containing the approximate
+        minimum location, the function value at this location, the number of iterations performed, and the status of
+        the computation ("Success" or "Failure"). The computation fails when the gradient or the Hessian is not finite
+        or the Hessian is not positive definite.
+        """
+        variables = ordered_symbols(f) if variables is None else tuple(variables)
+        gradient_and_hessian = compile_multivariate(f, variables, (1, 2))
+        x_k = np.array(x_k, dtype=float)
+        iterations = 0
+        result_status = "Success"
+
+        while iterations < max_iterations:
+            with np.errstate(all='ignore'):
+                gradient, hessian = gradient_and_hessian(x_k)
+            if not np.all(np.isfinite(gradient)) or not np.all(np.isfinite(hessian)):
+                print("Invalid gradient or Hessian encountered.")
+                result_status = "Failure"
+                return None, None, None, result_status
+
+            try:
+                step = scipy.linalg.cho_solve(scipy.linalg.cho_factor(hessian), -gradient)
+            except np.linalg.LinAlgError:
+                print("Hessian is not positive definite.")
+                result_status = "Failure"
+                return None, None, None, result_status
+
+            x_k = x_k + step
+            if np.linalg.norm(step) < tolerance:
+                break
+            iterations += 1
+
+        return x_k, compile_multivariate(f, variables)(x_k), iterations, result_status
+
+    @staticmethod
+    def gradient_method(fun: sp.Expr, uk: Sequence[float], max_iterations: int = 1000, tolerance: float = 1e-6,
+                        alpha: float = 0.01, beta: float = 0.5, max_value: float = 1e20, line_search: str = 'armijo',
+                        variables: Optional[Sequence[sp.Symbol]] = None) -> Tuple[
+        Optional[np.ndarray], Optional[float], int, str]:
+        """
+        Gradient descent method for optimizing a function of several variables by iteratively moving against the
+        gradient.
+
+        Parameters:
+        - fun (sp.Expr): The function to optimize, represented as a SymPy expression.
+        - uk (Sequence[float]): Initial guess for the minimum, one component per variable.
+        - max_iterations (int): Maximum allowed number of iterations.
+        - tolerance (float): Convergence tolerance, the algorithm stops when the gradient's norm is less than this value.
+        - alpha (float): Coefficient for the line search to ensure sufficient decrease in function value.
+        - beta (float): Reduction factor for step size during line search.
+        - max_value (float): Maximum allowed absolute value of any component to prevent overflow or extreme values.
+        - line_search (str): The step size strategy, one of `line_search.LINE_SEARCHES`.
+        - variables (Sequence[sp.Symbol]): The variables in the order of the components of `uk`; by default the free
+        symbols of `fun` in natural order.
+
+        Returns:
+        Tuple[Optional[np.ndarray], Optional[float], int, str]: Returns the optimized point, the function value at this
+        point, the number of iterations used, and the status ("Success" or "Failure").
+        """
+        variables = ordered_symbols(fun) if variables is None else tuple(variables)
+        gradient_fun = compile_multivariate(fun, variables, 1)
+        fun = compile_multivariate(fun, variables)
+        search = LINE_SEARCHES[line_search](alpha, beta)
+        uk = np.array(uk, dtype=float)
+        f_uk = fun(uk)
+        i = 0
+        result_status = "Success"
+
+        for k in range(max_iterations):
+            grad_val = gradient_fun(uk)
+            step_size, f_uk = search(fun, gradient_fun, uk, f_uk, grad_val)
+
+            uk = uk - step_size * grad_val
+            if np.linalg.norm(grad_val) < tolerance:
+                break
+            i += 1
+
+            if np.max(np.abs(uk)) > max_value:
+                result_status = "Failure"
+                return None, None, 0, result_status
+
+            if i == max_iterations:
+                result_status = "Failure"
+                return None, None, 0, result_status
+
+        return uk, f_uk, i, result_status
@@ -1,7 +1,13 @@
+from __future__ import annotations
 import random
-import sympy as sp
 import numpy as np
-from typing import Tuple, Optional
+from typing import TYPE_CHECKING, Callable, Tuple, Optional, Union
+from function_cache import compile_function, evaluate_array
+from instrumentation import phase_timer, timed_phases, trace_run
+from line_search import LINE_SEARCHES
+
+if TYPE_CHECKING:
+    import sympy as sp
 
 
 class PointOptimizationMethods:
@@ -10,13 +16,15 @@ class PointOptimizationMethods:
     """
 
     @staticmethod
-    def newtons_method(f: sp.Expr, x_k: float, tolerance: float = 1e-6, max_iterations: int = 100) -> Tuple[
-        Optional[float], Optional[float], Optional[int], str]:
+    @timed_phases
+    def newtons_method(f: Union[sp.Expr, Callable], x_k: float, tolerance: float = 1e-6,
+                       max_iterations: int = 100) -> Tuple[Optional[float], Optional[float], Optional[int], str]:
         """
         Newton's method for finding a local minimum of a function using its derivatives.
 
         Parameters:
-        - f (sp.Expr): The function to be minimized, expressed as a SymPy expression.
+        - f (sp.Expr or Callable): The function to be minimized, expressed as a SymPy expression or a plain function of
+        x written with operators and NumPy functions.
         - x_k (float): Initial guess for the location of the minimum.
         - tolerance (float): The convergence criterion; the algorithm stops when the difference between successive
         iterates is below this value.
@@ -27,18 +35,19 @@ class PointOptimizationMethods:
         location, the function value at this location, the number of iterations performed, and the status of the
          computation ("Success" or "Failure").
         """
-        x = sp.symbols('x')
-        f_prime = sp.diff(f, x)
-        f_double_prime = sp.diff(f_prime, x)
-        f_prime_lambdified = sp.lambdify(x, f_prime, "numpy")
-        f_double_prime_lambdified = sp.lambdify(x, f_double_prime, "numpy")
+        # f' and f'' are evaluated together by one fused callable that shares their common subexpressions
+        derivatives_lambdified = compile_function(f, (1, 2))
+        f_lambdified = compile_function(f)
+        record = trace_run('newtons_method')
+        phases = phase_timer()
+        if phases is not None:
+            phases.mark('Compile')
         iterations = 0
         result_status = "Success"
 
         while iterations < max_iterations:
             try:
-                first_derivative_at_x = f_prime_lambdified(x_k)
-                second_derivative_at_x = f_double_prime_lambdified(x_k)
+                first_derivative_at_x, second_derivative_at_x = derivatives_lambdified(x_k)
 
                 # Check if the second derivative is inf or nan, or too close to zero
                 if np.isinf(second_derivative_at_x) or np.isnan(second_derivative_at_x) or abs(
@@ -58,6 +67,10 @@ class PointOptimizationMethods:
                     result_status = "Failure"
                     return None, None, None, result_status
 
+                if record is not None:
+                    # Newton's method itself never evaluates f, so only a traced run does
+                    record(x_k1, f_lambdified(x_k1))
+
                 if abs(x_k1 - x_k) < tolerance:
                     x_k = x_k1
                     break
@@ -68,50 +81,126 @@ class PointOptimizationMethods:
                 print(f"Numerical error encountered: {e}")
                 return None, None, None, "Failure"
 
-        f_lambdified = sp.lambdify(x, f, "numpy")
+        if phases is not None:
+            phases.mark('Iteration')
         return x_k, f_lambdified(x_k), iterations, result_status
 
     @staticmethod
-    def gradient_method(fun: sp.Expr, uk: float, max_iterations: int = 1000, tolerance: float = 1e-6,
-                        alpha: float = 0.01, beta: float = 0.5, max_value: float = 1e20) -> Tuple[
-        Optional[float], Optional[float], int, str]:
+    @timed_phases
+    def batch_newtons_method(f: Union[sp.Expr, Callable], x_0: np.ndarray, tolerance: float = 1e-6,
+                             max_iterations: int = 100) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Vectorized Newton's method that iterates many starting points together with array operations. Every element
+        follows exactly the same rules as `newtons_method`, but converged and failed elements are masked out instead of
+        leaving a Python loop.
+
+        Parameters:
+        - f (sp.Expr or Callable): The function to be minimized, expressed as a SymPy expression or a plain function of
+        x written with operators and NumPy functions.
+        - x_0 (np.ndarray): Array of initial guesses; the results have the same shape.
+        - tolerance (float): The convergence criterion; an element stops when the difference between its successive
+        iterates is below this value.
+        - max_iterations (int): The maximum number of iterations to execute before stopping.
+
+        Returns:
+        Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]: Arrays of the approximate minimum locations, the function
+        values at these locations, the number of iterations performed by each element, and the status of each element
+        ("Success" or "Failure"). Failed elements (NaN/inf derivatives or a second derivative too close to zero) hold
+        NaN in the location and value arrays.
+        """
+        derivatives_lambdified = compile_function(f, (1, 2))
+        phases = phase_timer()
+        if phases is not None:
+            phases.mark('Compile')
+        x_k = np.array(x_0, dtype=float)
+        shape = x_k.shape
+        x_k = x_k.ravel()
+        iterations = np.zeros(x_k.shape, dtype=int)
+        active = np.ones(x_k.shape, dtype=bool)
+        failed = np.zeros(x_k.shape, dtype=bool)
+
+        with np.errstate(all='ignore'):
+            for _ in range(max_iterations):
+                indices = np.flatnonzero(active)
+                if indices.size == 0:
+                    break
+                x_active = x_k[indices]
+                first_derivative_at_x, second_derivative_at_x = (
+                    np.broadcast_to(np.asarray(value, dtype=float), x_active.shape)
+                    for value in derivatives_lambdified(x_active))
+
+                x_k1 = x_active - first_derivative_at_x / second_derivative_at_x
+                # Same failure rules as the scalar method: invalid derivatives, near-zero curvature or a NaN step
+                invalid = (~np.isfinite(second_derivative_at_x) | (np.abs(second_derivative_at_x) < 1e-8)
+                           | ~np.isfinite(first_derivative_at_x) | np.isnan(x_k1))
+                converged = ~invalid & (np.abs(x_k1 - x_active) < tolerance)
+
+                x_k[indices] = np.where(invalid, x_active, x_k1)
+                iterations[indices[~invalid & ~converged]] += 1
+                failed[indices[invalid]] = True
+                active[indices[invalid | converged]] = False
+
+            if phases is not None:
+                phases.mark('Iteration')
+            function_values = np.full(x_k.shape, np.nan)
+            function_values[~failed] = evaluate_array(compile_function(f), x_k[~failed])
+        x_k[failed] = np.nan
+        result_status = np.where(failed, "Failure", "Success")
+
+        return (x_k.reshape(shape), function_values.reshape(shape), iterations.reshape(shape),
+                result_status.reshape(shape))
+
+    @staticmethod
+    @timed_phases
+    def gradient_method(fun: Union[sp.Expr, Callable], uk: float, max_iterations: int = 1000, tolerance: float = 1e-6,
+                        alpha: float = 0.01, beta: float = 0.5, max_value: float = 1e20,
+                        line_search: str = 'armijo') -> Tuple[Optional[float], Optional[float], int, str]:
         """
         Gradient descent method for optimizing a function by iteratively moving against the gradient.
 
         Parameters:
-        - fun (sp.Expr): The function to optimize, represented as a SymPy expression.
+        - fun (sp.Expr or Callable): The function to optimize, represented as a SymPy expression or a plain function
+        of x.
         - uk (float): Initial guess for the minimum value.
         - max_iterations (int): Maximum allowed number of iterations.
         - tolerance (float): Convergence tolerance, the algorithm stops when the gradient's norm is less than this value.
         - alpha (float): Coefficient for the line search to ensure sufficient decrease in function value.
         - beta (float): Reduction factor for step size during line search.
         - max_value (float): Maximum allowed value for the function argument to prevent overflow or extreme values.
+        - line_search (str): The step size strategy, one of `line_search.LINE_SEARCHES`: 'armijo' (backtracking from a
+        unit step), 'warm-start' (backtracking from the previous step), 'barzilai-borwein' or 'wolfe' (strong Wolfe
+        conditions with interpolation).
 
         Returns:
         Tuple[Optional[float], Optional[float], int, str]: Returns the optimized variable value, the function value at
         this optimized variable, the number of iterations used, and the status ("Success" or "Failure").
         """
-        x = sp.symbols('x')
-        f = fun
-        gradient = sp.diff(f, x)
-        gradient_fun = sp.lambdify(x, gradient, 'numpy')
-        fun = sp.lambdify(x, f, 'numpy')
+        gradient_fun = compile_function(fun, 1)
+        fun = compile_function(fun)
+        search = LINE_SEARCHES[line_search](alpha, beta)
+        record = trace_run('gradient_method')
+        phases = phase_timer()
+        if phases is not None:
+            phases.mark('Compile')
+        f_uk = None
         i = 0
         result_status = "Success"
 
         for k in range(max_iterations):
             try:
                 grad_val = gradient_fun(uk)
+                if f_uk is None:
+                    f_uk = fun(uk)
+                # The line search returns the function value at the accepted point, which is reused next iteration
+                step_size, f_uk = search(fun, gradient_fun, uk, f_uk, grad_val)
             except ZeroDivisionError:
                 print("Division by zero. Stop iteration")
                 result_status = "Failure"
                 return 0, 0, 0, result_status
-            step_size = 1.0
-
-            while fun(uk - step_size * grad_val) > fun(uk) - alpha * step_size * np.square(np.linalg.norm(grad_val)):
-                step_size *= beta
 
             uk = uk - step_size * grad_val
+            if record is not None:
+                record(uk, f_uk)
             if np.linalg.norm(grad_val) < tolerance:
                 break
             i += 1
@@ -124,17 +213,22 @@ class PointOptimizationMethods:
                 result_status = "Failure"
                 return 0, 0, 0, result_status
 
-        return uk, fun(uk), i, result_status
+        if phases is not None:
+            phases.mark('Iteration')
+        if f_uk is None:
+            f_uk = fun(uk)
+        return uk, f_uk, i, result_status
 
     @staticmethod
-    def random_search(fun_expr: sp.Expr, x_k: float, tolerance: float = 1e-6, step_size: float = 1,
+    @timed_phases
+    def random_search(fun_expr: Union[sp.Expr, Callable], x_k: float, tolerance: float = 1e-6, step_size: float = 1,
                       max_iterations: int = 1000, shrink_step: bool = True) -> Tuple[float, float, int, str]:
         """
         Random search method for function optimization starting from an initial guess and exploring the function
         space randomly.
 
         Parameters:
-        - fun_expr (sp.Expr): The function to optimize, given as a SymPy expression.
+        - fun_expr (sp.Expr or Callable): The function to optimize, given as a SymPy expression or a plain function.
         - x_k (float): Initial guess for the optimal value.
         - tolerance (float): Tolerance for convergence; the search stops when the improvement between iterations is
         smaller than this value.
@@ -146,8 +240,11 @@ class PointOptimizationMethods:
         Tuple[float, float, int, str]: Returns the optimized variable value, the best function value found, the number
          of iterations performed, and the result status ("Success" or "Failure").
         """
-        x = sp.symbols('x')
-        fun_lambdified = sp.lambdify(x, fun_expr, 'numpy')
+        fun_lambdified = compile_function(fun_expr)
+        record = trace_run('random_search')
+        phases = phase_timer()
+        if phases is not None:
+            phases.mark('Compile')
 
         best_x = x_k
         best_fun_val = fun_lambdified(x_k)
@@ -168,12 +265,86 @@ class PointOptimizationMethods:
             if shrink_step and (step_size > tolerance):
                 step_size = 0.95 * step_size
 
+            if record is not None:
+                record(best_x, best_fun_val, step_size)
+
             iterations += 1
             # Terminate if improvement is less than tolerance
             if abs(fun_val - previous_fun_val) < tolerance:
                 break
 
             previous_fun_val = fun_val
+        if phases is not None:
+            phases.mark('Iteration')
+        if iterations == max_iterations:
+            return best_x, best_fun_val, iterations, "Failure"
+        return best_x, best_fun_val, iterations, "Success"
+
+    @staticmethod
+    @timed_phases
+    def batch_random_search(fun_expr: Union[sp.Expr, Callable], x_k: float, tolerance: float = 1e-6,
+                            step_size: float = 1, max_iterations: int = 1000, candidates: int = 16,
+                            seed: Optional[int] = None, expand: float = 1.0,
+                            shrink: float = 0.95) -> Tuple[float, float, int, str]:
+        """
+        Random search that proposes several candidates per iteration from a seeded `numpy.random.Generator` and
+        evaluates them in one vectorized call. The best candidate replaces the current point when it improves on it;
+        the step size is multiplied by `expand` after an improvement and by `shrink` otherwise.
+
+        Parameters:
+        - fun_expr (sp.Expr or Callable): The function to optimize, given as a SymPy expression or a plain function.
+        - x_k (float): Initial guess for the optimal value.
+        - tolerance (float): Tolerance for convergence; the search stops when an improvement is smaller than this value
+        or the step size has shrunk below it.
+        - step_size (float): Initial step size; candidates are drawn uniformly within this distance of the current
+        point.
+        - max_iterations (int): Maximum number of iterations to perform.
+        - candidates (int): Number of candidates proposed per iteration.
+        - seed (Optional[int]): Seed of the random generator; the same seed replays the same search.
+        - expand (float): Step size factor after an improving iteration.
+        - shrink (float): Step size factor after an iteration without improvement.
+
+        Returns:
+        Tuple[float, float, int, str]: Returns the optimized variable value, the best function value found, the number
+         of iterations performed, and the result status ("Success" or "Failure").
+        """
+        fun_lambdified = compile_function(fun_expr)
+        rng = np.random.default_rng(seed)
+        record = trace_run('batch_random_search')
+        phases = phase_timer()
+        if phases is not None:
+            phases.mark('Compile')
+
+        best_x = float(x_k)
+        best_fun_val = float(fun_lambdified(best_x))
+        iterations = 0
+
+        for i in range(max_iterations):
+            x_candidates = best_x + step_size * rng.uniform(-1, 1, candidates)
+            with np.errstate(all='ignore'):
+                fun_vals = evaluate_array(fun_lambdified, x_candidates)
+            iterations += 1
+
+            finite = np.isfinite(fun_vals)
+            best_index = np.argmin(np.where(finite, fun_vals, np.inf))
+            # A start outside the function's domain (NaN) is replaced by the first finite candidate
+            if finite[best_index] and not fun_vals[best_index] >= best_fun_val:
+                improvement = best_fun_val - fun_vals[best_index]
+                best_x = float(x_candidates[best_index])
+                best_fun_val = float(fun_vals[best_index])
+                step_size *= expand
+                converged = improvement < tolerance
+            else:
+                step_size *= shrink
+                converged = step_size < tolerance
+
+            if record is not None:
+                record(best_x, best_fun_val, step_size)
+            if converged:
+                break
+
+        if phases is not None:
+            phases.mark('Iteration')
         if iterations == max_iterations:
             return best_x, best_fun_val, iterations, "Failure"
         return best_x, best_fun_val, iterations, "Success"
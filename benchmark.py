@@ -0,0 +1,64 @@
+import gc
+import time
+from collections import namedtuple
+from typing import Callable, Dict, Tuple
+import numpy as np
+from instrumentation import PHASES, EvaluationCounter, count_evaluations, time_phases
+
+BenchmarkSettings = namedtuple('BenchmarkSettings', ['warmup', 'repeats', 'disable_gc'], defaults=(1, 5, True))
+Timing = namedtuple('Timing', ['min', 'median', 'iqr', 'repeats'])
+
+
+def benchmark(func, method: Callable, *args, settings: BenchmarkSettings = BenchmarkSettings(),
+              **kwargs) -> Tuple[tuple, Timing, EvaluationCounter, Dict[str, float]]:
+    """
+    Times an optimization method with warmup runs and repeated measurements, so that the reported time reflects the
+    algorithm rather than clock resolution and first-call effects. The first warmup run counts the evaluations of the
+    objective and its derivatives, so at least one untimed run is always made and the timed runs stay uninstrumented.
+    The phase times (see `instrumentation.PhaseTimer`) are the medians of as many more runs as timed repeats, made
+    under the same conditions, except for the symbolic and compilation times: these are paid once, when the function
+    is not in the compiled-function cache yet, so they come from the single counted run.
+
+    Parameters:
+    - func: The function to optimize, passed as the first argument of the method.
+    - method (Callable): The optimization method.
+    - *args, **kwargs: The remaining arguments of the method.
+    - settings (BenchmarkSettings): Number of untimed warmup runs, number of timed repeats, and whether the garbage
+    collector is disabled while timing.
+
+    Returns:
+    Tuple[tuple, Timing, EvaluationCounter, Dict[str, float]]: The result of the counted run, the minimum, median and
+    interquartile range of the timed runs in seconds, the evaluation counts of the counted run, and the time of every
+    phase in seconds.
+    """
+    with count_evaluations() as counter, time_phases() as cold_phases:
+        result = method(func, *args, **kwargs)
+    for _ in range(settings.warmup - 1):
+        method(func, *args, **kwargs)
+
+    gc_was_enabled = gc.isenabled()
+    # Like timeit, only suspend the collector; a full collection per cell would cost more than most cells
+    if settings.disable_gc:
+        gc.disable()
+    try:
+        samples = []
+        for _ in range(max(settings.repeats, 1)):
+            start_time = time.perf_counter_ns()
+            method(func, *args, **kwargs)
+            samples.append(time.perf_counter_ns() - start_time)
+        # Split separate runs into phases, so that the timed runs stay uninstrumented
+        phase_samples = []
+        for _ in range(max(settings.repeats, 1)):
+            with time_phases() as phases:
+                method(func, *args, **kwargs)
+            phase_samples.append(phases.times)
+    finally:
+        if gc_was_enabled:
+            gc.enable()
+
+    samples = np.array(samples) / 1e9
+    first_quartile, median, third_quartile = np.percentile(samples, [25, 50, 75])
+    phase_times = {phase: float(np.median([times[phase] for times in phase_samples])) for phase in PHASES}
+    phase_times.update(Symbolic=cold_phases.times['Symbolic'], Compile=cold_phases.times['Compile'])
+    return (result, Timing(samples.min(), median, third_quartile - first_quartile, len(samples)), counter,
+            phase_times)
@@ -0,0 +1,117 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+from itertools import combinations
+from typing import Dict, Optional, Sequence, Tuple
+import numpy as np
+import pandas as pd
+
+
+def _resampled_mean(sorted_sample: np.ndarray, indices: np.ndarray) -> np.ndarray:
+    return sorted_sample[indices].mean(axis=-1)
+
+
+def _resampled_median(sorted_sample: np.ndarray, indices: np.ndarray) -> np.ndarray:
+    # The sample is sorted, so the middle indices of a resample point at its middle values; partitioning the small
+    # integer indices is much cheaper than np.median over the gathered floats
+    half = indices.shape[-1] // 2
+    partitioned = np.partition(indices, half, axis=-1)
+    upper = sorted_sample[partitioned[:, half]]
+    if indices.shape[-1] % 2:
+        return upper
+    return (sorted_sample[partitioned[:, :half].max(axis=-1)] + upper) / 2
+
+
+# name: (statistic of a sample, statistic of every row of a resample index matrix into the sorted sample)
+STATISTICS = {
+    'mean': (np.mean, _resampled_mean),
+    'median': (np.median, _resampled_median),
+}
+
+
+def _bootstrap_chunk(groups: Dict[str, np.ndarray], n_resamples: int, seed: np.random.SeedSequence,
+                     statistics: Sequence[str]) -> Dict[str, Dict[str, np.ndarray]]:
+    """Draws `n_resamples` resamples of every group as one index matrix and returns their statistics."""
+    rng = np.random.default_rng(seed)
+    distributions = {}
+    for name, sample in groups.items():
+        sorted_sample = np.sort(sample)
+        index_type = np.int16 if len(sample) <= np.iinfo(np.int16).max else np.int64
+        indices = rng.integers(0, len(sample), size=(n_resamples, len(sample)), dtype=index_type)
+        distributions[name] = {statistic: STATISTICS[statistic][1](sorted_sample, indices)
+                               for statistic in statistics}
+    return distributions
+
+
+def bootstrap_distributions(groups: Dict[str, np.ndarray], n_resamples: int = 10000, seed: int = 0,
+                            workers: Optional[int] = 1, chunk_size: int = 5000,
+                            statistics: Sequence[str] = ('mean', 'median')) -> Dict[str, Dict[str, np.ndarray]]:
+    """
+    Computes the bootstrap distribution of each statistic for every group. The resamples are drawn in chunks of
+    `chunk_size` rows, each from its own child of `np.random.SeedSequence(seed)`, so the result depends on the seed
+    only and not on the number of worker processes.
+
+    Parameters:
+    - groups (Dict[str, np.ndarray]): The samples, e.g. the times of every method.
+    - n_resamples (int): The number of bootstrap resamples.
+    - seed (int): The root seed.
+    - workers (Optional[int]): Number of worker processes; None uses every CPU core and 1 runs in this process.
+    - chunk_size (int): The number of resamples drawn at once, which bounds the size of the index matrices.
+    - statistics (Sequence[str]): The statistics to compute, keys of `STATISTICS`.
+
+    Returns:
+    Dict[str, Dict[str, np.ndarray]]: For every group and statistic, the `n_resamples` resampled values.
+    """
+    groups = {name: np.asarray(sample, dtype=float) for name, sample in groups.items()}
+    chunk_sizes = [min(chunk_size, n_resamples - start) for start in range(0, n_resamples, chunk_size)]
+    seeds = np.random.SeedSequence(seed).spawn(len(chunk_sizes))
+    arguments = ([groups] * len(chunk_sizes), chunk_sizes, seeds, [statistics] * len(chunk_sizes))
+    if workers == 1 or len(chunk_sizes) <= 1:
+        chunks = list(map(_bootstrap_chunk, *arguments))
+    else:
+        with ProcessPoolExecutor(min(workers or os.cpu_count(), len(chunk_sizes))) as executor:
+            chunks = list(executor.map(_bootstrap_chunk, *arguments))
+    return {name: {statistic: np.concatenate([chunk[name][statistic] for chunk in chunks])
+                   for statistic in statistics}
+            for name in groups}
+
+
+def confidence_intervals(df: pd.DataFrame, value: str = 'Time', by: str = 'Method', n_resamples: int = 10000,
+                         confidence: float = 0.95, seed: int = 0, workers: Optional[int] = 1,
+                         statistics: Sequence[str] = ('mean', 'median')) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """
+    Percentile bootstrap confidence intervals of the mean and median of `value` for every group of `by`, and of the
+    differences of these statistics between every pair of groups. The groups are resampled independently, so the
+    distribution of a difference is the difference of the two groups' distributions resample by resample.
+
+    Parameters:
+    - df (pd.DataFrame): The optimization results.
+    - value (str): The column to summarize.
+    - by (str): The column defining the groups.
+    - n_resamples (int): The number of bootstrap resamples.
+    - confidence (float): The confidence level of the intervals.
+    - seed (int): The root seed, see `bootstrap_distributions`.
+    - workers (Optional[int]): Number of worker processes; None uses every CPU core.
+    - statistics (Sequence[str]): The statistics to compute, keys of `STATISTICS`.
+
+    Returns:
+    Tuple[pd.DataFrame, pd.DataFrame]: The intervals per group (columns `by`, 'Statistic', 'Estimate', 'Lower',
+    'Upper') and per pair of groups (columns 'A', 'B', 'Statistic', 'Difference', 'Lower', 'Upper', 'Significant',
+    where a significant difference has an interval excluding zero).
+    """
+    groups = {name: group.to_numpy(dtype=float) for name, group in df.groupby(by, sort=False, observed=True)[value]}
+    distributions = bootstrap_distributions(groups, n_resamples, seed, workers, statistics=statistics)
+    quantiles = [(1 - confidence) / 2 * 100, (1 + confidence) / 2 * 100]
+    estimates = {name: {statistic: float(STATISTICS[statistic][0](sample)) for statistic in statistics}
+                 for name, sample in groups.items()}
+
+    intervals = [(name, statistic, estimates[name][statistic], *np.percentile(distributions[name][statistic], quantiles))
+                 for name in groups for statistic in statistics]
+    differences = []
+    for first, second in combinations(groups, 2):
+        for statistic in statistics:
+            lower, upper = np.percentile(distributions[first][statistic] - distributions[second][statistic],
+                                         quantiles)
+            differences.append((first, second, statistic, estimates[first][statistic] - estimates[second][statistic],
+                                lower, upper, not lower <= 0 <= upper))
+    return (pd.DataFrame(intervals, columns=[by, 'Statistic', 'Estimate', 'Lower', 'Upper']),
+            pd.DataFrame(differences, columns=['A', 'B', 'Statistic', 'Difference', 'Lower', 'Upper', 'Significant']))
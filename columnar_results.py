@@ -0,0 +1,218 @@
+import csv
+import json
+import math
+import os
+from typing import Dict, Iterable, List, Tuple
+import numpy as np
+
+# Columns of the CSV export, in the order of the original result files
+RESULT_COLUMNS = ['Optimization Type', 'Function Name', 'Parameter', 'Method', 'Optimal x', 'Function Value',
+                  'Iterations', 'Result', 'Time', 'Precision', 'Time Min', 'Time IQR', 'Repeats', 'f Evaluations',
+                  "f' Evaluations", "f'' Evaluations", 'Symbolic Time', 'Compile Time', 'Iteration Time',
+                  'Finalize Time', 'Cumulative Time', 'Cumulative Iterations']
+# Columns stored as integer codes into the category lists kept next to the array
+CATEGORICAL_COLUMNS = ['Optimization Type', 'Function Name', 'Method', 'Result']
+# Missing integers (e.g. the iterations of a failed run) are stored as -1 and missing floats as NaN; the cumulative
+# columns are only filled in by precision ladder sweeps
+RESULT_DTYPE = np.dtype([
+    ('Optimization Type', 'u1'), ('Function Name', 'u2'), ('Lower Bound', 'f8'), ('Upper Bound', 'f8'),
+    ('Start Point', 'f8'), ('Method', 'u1'), ('Optimal x', 'f8'), ('Function Value', 'f8'), ('Iterations', 'i8'),
+    ('Result', 'u1'), ('Time', 'f8'), ('Precision', 'f8'), ('Time Min', 'f8'), ('Time IQR', 'f8'), ('Repeats', 'i4'),
+    ('f Evaluations', 'i8'), ("f' Evaluations", 'i8'), ("f'' Evaluations", 'i8'), ('Symbolic Time', 'f8'),
+    ('Compile Time', 'f8'), ('Iteration Time', 'f8'), ('Finalize Time', 'f8'), ('Cumulative Time', 'f8'),
+    ('Cumulative Iterations', 'i8'),
+])
+# Room left in the .npy header for the row count to grow while the file is being written
+_HEADER_SLACK = 32
+
+
+def categories_path(path: str) -> str:
+    """Returns the path of the JSON file holding the category labels of a columnar result file."""
+    return os.path.splitext(path)[0] + '.json'
+
+
+class ColumnarResultWriter:
+    """
+    Streams result records into a NumPy structured array saved as a .npy file. The rows are appended in binary and the
+    header is rewritten with the current row count on every flush, so the file can be memory-mapped with `np.load`
+    at any time, also while a sweep is still running or after it was interrupted. Strings are stored as small integer
+    codes; their labels go to a JSON file next to the array.
+    """
+
+    def __init__(self, path: str, flush_every: int = 100):
+        """
+        Parameters:
+        - path (str): The .npy file to write; an existing file is replaced.
+        - flush_every (int): The number of rows buffered in memory before they are written.
+        """
+        self.path = path
+        self.categories: Dict[str, List[str]] = {column: [] for column in CATEGORICAL_COLUMNS}
+        self._codes: Dict[str, Dict[str, int]] = {column: {} for column in CATEGORICAL_COLUMNS}
+        self._buffer = np.zeros(flush_every, dtype=RESULT_DTYPE)
+        self._buffered = 0
+        self.rows = 0
+        self._file = open(path, 'wb')
+        # magic (6) + version (2) + header length (2) + header, padded to a multiple of 64 like np.save
+        self._header_length = 10 + len(self._header()) + _HEADER_SLACK + 1
+        self._header_length += -self._header_length % 64
+        self._write_header()
+
+    def append(self, row: dict) -> None:
+        """Adds a record keyed by the CSV result columns; the 'Parameter' is an interval tuple or a start point."""
+        record = self._buffer[self._buffered]
+        for column in CATEGORICAL_COLUMNS:
+            record[column] = self._code(column, row[column])
+        parameter = row['Parameter']
+        lower, upper, start = (*parameter, math.nan) if isinstance(parameter, tuple) else (math.nan, math.nan,
+                                                                                          parameter)
+        record['Lower Bound'], record['Upper Bound'], record['Start Point'] = lower, upper, start
+        for column in RESULT_COLUMNS:
+            if column != 'Parameter' and column not in CATEGORICAL_COLUMNS:
+                # The buffer is reused, so columns absent from the row are explicitly stored as missing
+                value = row.get(column)
+                record[column] = (-1 if RESULT_DTYPE[column].kind == 'i' else math.nan) if value is None else value
+        self._buffered += 1
+        if self._buffered == len(self._buffer):
+            self.flush()
+
+    def flush(self) -> None:
+        """Writes the buffered rows, then updates the row count in the header and the category labels."""
+        self._file.write(self._buffer[:self._buffered].tobytes())
+        self.rows += self._buffered
+        self._buffered = 0
+        self._file.seek(0)
+        self._write_header()
+        self._file.seek(0, os.SEEK_END)
+        self._file.flush()
+        with open(categories_path(self.path), 'w') as categories_file:
+            json.dump(self.categories, categories_file, indent=1)
+
+    def close(self) -> None:
+        if not self._file.closed:
+            self.flush()
+            self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def _code(self, column: str, label: str) -> int:
+        codes = self._codes[column]
+        if label not in codes:
+            codes[label] = len(codes)
+            self.categories[column].append(label)
+        return codes[label]
+
+    def _header(self) -> str:
+        return repr({'descr': np.lib.format.dtype_to_descr(RESULT_DTYPE), 'fortran_order': False,
+                     'shape': (self.rows,)})
+
+    def _write_header(self) -> None:
+        self._file.write(np.lib.format.magic(1, 0))
+        self._file.write((self._header_length - 10).to_bytes(2, 'little'))
+        self._file.write((self._header().ljust(self._header_length - 11) + '\n').encode('latin1'))
+
+
+def load_results(path: str, mmap: bool = True) -> Tuple[np.ndarray, Dict[str, List[str]]]:
+    """
+    Loads a columnar result file without parsing any text.
+
+    Parameters:
+    - path (str): The .npy file written by `ColumnarResultWriter`.
+    - mmap (bool): Memory-map the array read-only instead of reading it into memory.
+
+    Returns:
+    Tuple[np.ndarray, Dict[str, List[str]]]: The structured array and the category labels of the coded columns.
+    """
+    with open(categories_path(path)) as categories_file:
+        categories = json.load(categories_file)
+    return np.load(path, mmap_mode='r' if mmap else None), categories
+
+
+def results_dataframe(path: str, mmap: bool = True):
+    """
+    Returns a columnar result file as a pandas DataFrame: the coded columns become categoricals built directly from
+    their codes, and the numeric columns wrap the (memory-mapped) array.
+    """
+    import pandas as pd
+    array, categories = load_results(path, mmap)
+    columns = {}
+    # Files written before a column was added simply lack it
+    for column in array.dtype.names:
+        if column in CATEGORICAL_COLUMNS:
+            columns[column] = pd.Categorical.from_codes(array[column].astype(np.int32), categories=categories[column])
+        else:
+            columns[column] = array[column]
+    return pd.DataFrame(columns)
+
+
+def read_results(path: str):
+    """
+    Reads a result file into a DataFrame: a columnar .npy file, or a CSV file from earlier sweeps. When a .npy file has
+    not been written yet (e.g. on a fresh checkout, which only holds the CSV results), the CSV file of the same name is
+    read instead.
+    """
+    import pandas as pd
+    if not path.endswith('.csv') and not os.path.exists(path):
+        csv_path = os.path.splitext(path)[0] + '.csv'
+        if not os.path.exists(csv_path):
+            raise FileNotFoundError(f"No result file '{path}' (nor '{csv_path}'); run `python main.py sweep` first")
+        path = csv_path
+    if path.endswith('.csv'):
+        return pd.read_csv(path)
+    return results_dataframe(path)
+
+
+def csv_value(column: str, value):
+    """
+    Returns a numeric result value as the CSV export writes it: converted to the type of its column, and None when it
+    is missing (None, NaN, or -1 in an integer column).
+    """
+    if value is None or value != value:
+        return None
+    if RESULT_DTYPE[column].kind == 'i':
+        return None if value == -1 else int(value)
+    return float(value)
+
+
+def csv_row(row: dict) -> dict:
+    """
+    Returns a result record (see `ColumnarResultWriter.append`) with its numeric values formatted by `csv_value`, so
+    that a CSV file streamed during the sweep matches the one written by `export_csv`.
+    """
+    return {column: csv_value(column, row.get(column))
+            if column != 'Parameter' and column not in CATEGORICAL_COLUMNS else row[column]
+            for column in RESULT_COLUMNS}
+
+
+def iter_csv_rows(array: np.ndarray, categories: Dict[str, List[str]]) -> Iterable[dict]:
+    for record in array:
+        row = {column: categories[column][record[column]] for column in CATEGORICAL_COLUMNS}
+        if math.isnan(record['Start Point']):
+            row['Parameter'] = f"({record['Lower Bound']:g}, {record['Upper Bound']:g})"
+        else:
+            row['Parameter'] = f"{record['Start Point']:g}"
+        for column in RESULT_COLUMNS:
+            if column not in row and column not in array.dtype.names:
+                row[column] = None
+            elif column not in row:
+                row[column] = csv_value(column, record[column].item())
+        yield row
+
+
+def export_csv(path: str, csv_path: str) -> int:
+    """
+    Exports a columnar result file to a CSV file with the columns of the original result files; missing values are
+    written as empty fields.
+
+    Returns:
+    int: The number of exported rows.
+    """
+    array, categories = load_results(path)
+    with open(csv_path, 'w', newline='') as file:
+        writer = csv.DictWriter(file, fieldnames=RESULT_COLUMNS)
+        writer.writeheader()
+        writer.writerows(iter_csv_rows(array, categories))
+    return len(array)
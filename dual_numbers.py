@@ -0,0 +1,169 @@
+from typing import Callable, Tuple, Union
+import numpy as np
+
+# g(u), g'(u) and g''(u) of the elementary NumPy functions supported by Dual
+_UNARY_DERIVATIVES = {
+    np.exp: lambda u: (np.exp(u), np.exp(u), np.exp(u)),
+    np.expm1: lambda u: (np.expm1(u), np.exp(u), np.exp(u)),
+    np.log: lambda u: (np.log(u), 1 / u, -1 / u ** 2),
+    np.log1p: lambda u: (np.log1p(u), 1 / (1 + u), -1 / (1 + u) ** 2),
+    np.log2: lambda u: (np.log2(u), 1 / (u * np.log(2)), -1 / (u ** 2 * np.log(2))),
+    np.log10: lambda u: (np.log10(u), 1 / (u * np.log(10)), -1 / (u ** 2 * np.log(10))),
+    np.sqrt: lambda u: (np.sqrt(u), 0.5 / np.sqrt(u), -0.25 / (u * np.sqrt(u))),
+    np.square: lambda u: (np.square(u), 2 * u, 2.0),
+    np.reciprocal: lambda u: (1 / u, -1 / u ** 2, 2 / u ** 3),
+    np.sin: lambda u: (np.sin(u), np.cos(u), -np.sin(u)),
+    np.cos: lambda u: (np.cos(u), -np.sin(u), -np.cos(u)),
+    np.tan: lambda u: (np.tan(u), 1 / np.cos(u) ** 2, 2 * np.tan(u) / np.cos(u) ** 2),
+    np.arctan: lambda u: (np.arctan(u), 1 / (1 + u ** 2), -2 * u / (1 + u ** 2) ** 2),
+    np.sinh: lambda u: (np.sinh(u), np.cosh(u), np.sinh(u)),
+    np.cosh: lambda u: (np.cosh(u), np.sinh(u), np.cosh(u)),
+    np.tanh: lambda u: (np.tanh(u), 1 / np.cosh(u) ** 2, -2 * np.tanh(u) / np.cosh(u) ** 2),
+    np.absolute: lambda u: (np.absolute(u), np.sign(u), 0.0),
+    np.negative: lambda u: (-u, -1.0, 0.0),
+    np.positive: lambda u: (u, 1.0, 0.0),
+}
+
+
+class Dual:
+    """
+    A truncated second-order Taylor number u + u' e + u'' e^2 / 2 used for forward-mode automatic differentiation.
+    Arithmetic operators and the NumPy functions listed in `_UNARY_DERIVATIVES` propagate the first and second
+    derivatives, and the components may be NumPy arrays, so one pass differentiates a function at many points. Plain
+    `math` functions and control flow on the value (other than comparisons) are not differentiated.
+    """
+
+    __slots__ = ('value', 'first', 'second')
+
+    def __init__(self, value, first=0.0, second=0.0):
+        self.value = value
+        self.first = first
+        self.second = second
+
+    @staticmethod
+    def lift(other) -> 'Dual':
+        """Returns the argument as a Dual, treating plain numbers and arrays as constants."""
+        return other if isinstance(other, Dual) else Dual(other)
+
+    def chain(self, value, first_derivative, second_derivative) -> 'Dual':
+        """Applies g to this number, given g(u), g'(u) and g''(u) at its value."""
+        return Dual(value, first_derivative * self.first,
+                    second_derivative * self.first ** 2 + first_derivative * self.second)
+
+    def __add__(self, other):
+        other = Dual.lift(other)
+        return Dual(self.value + other.value, self.first + other.first, self.second + other.second)
+
+    __radd__ = __add__
+
+    def __sub__(self, other):
+        other = Dual.lift(other)
+        return Dual(self.value - other.value, self.first - other.first, self.second - other.second)
+
+    def __rsub__(self, other):
+        return Dual.lift(other) - self
+
+    def __mul__(self, other):
+        if not isinstance(other, Dual):
+            return Dual(self.value * other, self.first * other, self.second * other)
+        return Dual(self.value * other.value, self.first * other.value + self.value * other.first,
+                    self.second * other.value + 2 * self.first * other.first + self.value * other.second)
+
+    __rmul__ = __mul__
+
+    def __truediv__(self, other):
+        if not isinstance(other, Dual):
+            return Dual(self.value / other, self.first / other, self.second / other)
+        return self * other.reciprocal()
+
+    def __rtruediv__(self, other):
+        return self.reciprocal() * other
+
+    def reciprocal(self) -> 'Dual':
+        return self.chain(1 / self.value, -1 / self.value ** 2, 2 / self.value ** 3)
+
+    def __pow__(self, exponent):
+        if isinstance(exponent, Dual):
+            # u ** w = exp(w log u)
+            return np.exp(exponent * np.log(self))
+        if exponent == 0:
+            return Dual(self.value ** 0)
+        if exponent == 1:
+            return self
+        return self.chain(self.value ** exponent, exponent * self.value ** (exponent - 1),
+                          exponent * (exponent - 1) * self.value ** (exponent - 2))
+
+    def __rpow__(self, base):
+        value = base ** self.value
+        log_base = np.log(base)
+        return self.chain(value, log_base * value, log_base ** 2 * value)
+
+    def __neg__(self):
+        return Dual(-self.value, -self.first, -self.second)
+
+    def __pos__(self):
+        return self
+
+    def __abs__(self):
+        return np.absolute(self)
+
+    # Comparisons only look at the value, so piecewise objectives pick the right branch
+    def __lt__(self, other):
+        return self.value < Dual.lift(other).value
+
+    def __le__(self, other):
+        return self.value <= Dual.lift(other).value
+
+    def __gt__(self, other):
+        return self.value > Dual.lift(other).value
+
+    def __ge__(self, other):
+        return self.value >= Dual.lift(other).value
+
+    def __array_ufunc__(self, ufunc, method, *inputs, **kwargs):
+        if method != '__call__' or kwargs:
+            return NotImplemented
+        if len(inputs) == 1 and ufunc in _UNARY_DERIVATIVES:
+            return self.chain(*_UNARY_DERIVATIVES[ufunc](self.value))
+        if len(inputs) == 2:
+            left, right = inputs
+            operators = {np.add: lambda: Dual.lift(left) + right, np.subtract: lambda: Dual.lift(left) - right,
+                         np.multiply: lambda: Dual.lift(left) * right, np.true_divide: lambda: Dual.lift(left) / right,
+                         np.power: lambda: left ** right if isinstance(left, Dual) else right.__rpow__(left)}
+            if ufunc in operators:
+                return operators[ufunc]()
+        return NotImplemented
+
+    def __repr__(self):
+        return f'Dual({self.value!r}, {self.first!r}, {self.second!r})'
+
+
+def derivatives(func: Callable, x) -> Tuple:
+    """
+    Evaluates a plain callable and its first and second derivatives at x (a float or a NumPy array) in a single forward
+    pass.
+
+    Returns:
+    Tuple: f(x), f'(x) and f''(x).
+    """
+    result = func(Dual(x, 1.0, 0.0))
+    if not isinstance(result, Dual):
+        # The function does not depend on x
+        return result, 0.0, 0.0
+    return result.value, result.first, result.second
+
+
+def differentiate(func: Callable, order: Union[int, Tuple[int, ...]] = 1) -> Callable:
+    """
+    Returns a callable evaluating the derivative of the given order (0, 1 or 2) of a plain function, or a list of
+    several derivatives computed in the same forward pass when `order` is a tuple.
+    """
+    if order == 0:
+        return func
+    if isinstance(order, tuple):
+        def fused(x):
+            values = derivatives(func, x)
+            return [values[derivative_order] for derivative_order in order]
+
+        return fused
+    return lambda x: derivatives(func, x)[order]
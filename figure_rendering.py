@@ -0,0 +1,98 @@
+import hashlib
+import inspect
+import json
+import os
+import pickle
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional, Sequence
+import pandas as pd
+import matplotlib.pyplot as plt
+
+# One figure: draw(data, *args) draws it on the current pyplot figure, which is then saved to path. `draw` must be a
+# module-level function so that the job can be sent to a worker process.
+FigureJob = namedtuple('FigureJob', ['path', 'draw', 'data', 'args'], defaults=((),))
+
+
+def figure_hash(job: FigureJob) -> str:
+    """
+    Returns a hash of everything a figure depends on: the source code of its draw function, its arguments and the
+    content of its data slice. Two renders with the same hash produce the same image.
+    """
+    digest = hashlib.sha256()
+    digest.update(inspect.getsource(job.draw).encode())
+    digest.update(repr(job.args).encode())
+    if isinstance(job.data, pd.DataFrame):
+        digest.update(repr(list(job.data.columns)).encode())
+        digest.update(pd.util.hash_pandas_object(job.data).values.tobytes())
+    elif isinstance(job.data, pd.Series):
+        digest.update(repr(job.data.name).encode())
+        digest.update(pd.util.hash_pandas_object(job.data).values.tobytes())
+    else:
+        digest.update(pickle.dumps(job.data))
+    return digest.hexdigest()
+
+
+def render_job(job: FigureJob) -> str:
+    """Draws and saves a single figure, then closes it, and returns its path."""
+    job.draw(job.data, *job.args)
+    plt.savefig(job.path)
+    plt.close('all')
+    return job.path
+
+
+def _init_worker():
+    plt.switch_backend('Agg')
+
+
+def render_figures(jobs: Sequence[FigureJob], workers: Optional[int] = None, show: bool = False,
+                   manifest_path: str = 'images/.figure_hashes.json') -> int:
+    """
+    Renders figures without blocking on `plt.show()`: on the non-interactive Agg backend, spread over a process pool,
+    and skipping every figure whose image exists and whose hash (see `figure_hash`) is recorded in the manifest from a
+    previous render.
+
+    Parameters:
+    - jobs (Sequence[FigureJob]): The figures to render.
+    - workers (Optional[int]): Number of worker processes; None uses every CPU core and 1 renders in this process.
+    - show (bool): Render interactively instead, showing every figure as before (no pool, nothing is skipped).
+    - manifest_path (str): The JSON file recording the hash of every rendered image.
+
+    Returns:
+    int: The number of figures actually rendered.
+    """
+    if show:
+        for job in jobs:
+            job.draw(job.data, *job.args)
+            plt.savefig(job.path)
+            plt.show()
+        return len(jobs)
+
+    try:
+        with open(manifest_path) as manifest_file:
+            manifest = json.load(manifest_file)
+    except (OSError, ValueError):
+        manifest = {}
+
+    hashes = {job.path: figure_hash(job) for job in jobs}
+    pending = [job for job in jobs if manifest.get(job.path) != hashes[job.path] or not os.path.exists(job.path)]
+    for directory in {os.path.dirname(job.path) for job in pending} - {''}:
+        os.makedirs(directory, exist_ok=True)
+
+    if len(pending) <= 1 or workers == 1:
+        # Render on Agg in this process too, but give the caller its own backend back
+        previous_backend = plt.get_backend()
+        _init_worker()
+        try:
+            rendered = [render_job(job) for job in pending]
+        finally:
+            plt.switch_backend(previous_backend)
+    else:
+        with ProcessPoolExecutor(min(workers or os.cpu_count(), len(pending)), initializer=_init_worker) as executor:
+            rendered = list(executor.map(render_job, pending))
+
+    manifest.update((path, hashes[path]) for path in rendered)
+    os.makedirs(os.path.dirname(manifest_path) or '.', exist_ok=True)
+    with open(manifest_path, 'w') as manifest_file:
+        json.dump(manifest, manifest_file, indent=1, sort_keys=True)
+    return len(rendered)
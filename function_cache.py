@@ -0,0 +1,232 @@
+from __future__ import annotations
+import re
+import sys
+import time
+from collections import OrderedDict, namedtuple
+from typing import TYPE_CHECKING, Callable, Sequence, Tuple, Union
+import numpy as np
+from dual_numbers import differentiate
+from instrumentation import active_counter, record_phase
+
+if TYPE_CHECKING:
+    import sympy as sp
+
+CacheInfo = namedtuple('CacheInfo', ['hits', 'misses', 'max_size', 'size'])
+
+
+class CompiledFunctionCache:
+    """
+    Bounded LRU cache of lambdified SymPy expressions and their derivatives. Every optimization method asks this cache
+    for the compiled objective and its derivatives, so `sp.diff` and `sp.lambdify` run once per expression and
+    derivative order instead of once per call. Plain Python callables are differentiated with dual numbers instead, so
+    SymPy is only imported when a symbolic expression is compiled.
+    """
+
+    def __init__(self, max_size: int = 256):
+        """
+        Parameters:
+        - max_size (int): The maximum number of compiled functions (and of symbolic derivatives) kept before the least
+        recently used entry is evicted.
+        """
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self._derivatives = OrderedDict()
+        self._compiled = OrderedDict()
+
+    def derivative(self, expr: sp.Expr, order: int = 0) -> sp.Expr:
+        """
+        Returns the symbolic derivative of the given order, differentiating from the cached lower-order derivative.
+
+        Parameters:
+        - expr (sp.Expr): The function, expressed as a SymPy expression.
+        - order (int): The derivative order; 0 returns the expression itself.
+
+        Returns:
+        sp.Expr: The derivative of `expr` with respect to x.
+        """
+        if order == 0:
+            return expr
+        key = (expr, order)
+        if key in self._derivatives:
+            self._derivatives.move_to_end(key)
+            return self._derivatives[key]
+        import sympy as sp
+        lower_derivative = self.derivative(expr, order - 1)
+        start_time = time.perf_counter()
+        result = sp.diff(lower_derivative, self.symbol)
+        record_phase('Symbolic', time.perf_counter() - start_time)
+        self._store(self._derivatives, key, result)
+        return result
+
+    @property
+    def symbol(self) -> sp.Symbol:
+        """The variable of the univariate functions."""
+        import sympy as sp
+        return sp.symbols('x')
+
+    def get(self, expr: Union[sp.Expr, Callable[[float], float]], order: Union[int, Tuple[int, ...]] = 0) -> Callable:
+        """
+        Returns the NumPy callable of the derivative of the given order, compiling it on the first request. With a tuple
+        of orders (e.g. (0, 1, 2)) a single fused callable returns all of these derivatives in one pass: `sp.cse` runs
+        over them together, so subterms they share, such as exp(x**2), are computed once. A plain callable is
+        differentiated with forward-mode dual numbers, which also yield every requested order in one pass.
+
+        Parameters:
+        - expr (sp.Expr or Callable): The function, expressed as a SymPy expression or a Python function of x written
+        with operators and NumPy functions.
+        - order (int or tuple of int): The derivative order; 0 returns the compiled function itself.
+
+        Returns:
+        Callable: The lambdified derivative (or list of derivatives), accepting floats or NumPy arrays.
+        """
+        key = (expr, order)
+        if key in self._compiled:
+            self.hits += 1
+            self._compiled.move_to_end(key)
+            return self._compiled[key]
+        self.misses += 1
+        if not is_symbolic(expr):
+            start_time = time.perf_counter()
+            result = differentiate(expr, order)
+        elif isinstance(order, tuple):
+            import sympy as sp
+            derivatives = [self.derivative(expr, derivative_order) for derivative_order in order]
+            start_time = time.perf_counter()
+            result = sp.lambdify(self.symbol, derivatives, 'numpy', cse=True)
+        else:
+            import sympy as sp
+            derivative = self.derivative(expr, order)
+            start_time = time.perf_counter()
+            result = sp.lambdify(self.symbol, derivative, 'numpy')
+        record_phase('Compile', time.perf_counter() - start_time)
+        self._store(self._compiled, key, result)
+        return result
+
+    def get_multivariate(self, expr: sp.Expr, variables: Sequence[sp.Symbol],
+                         order: Union[int, Tuple[int, ...]] = 0) -> Callable:
+        """
+        Returns a NumPy callable of a point vector that evaluates the function (order 0), its gradient (order 1) or its
+        Hessian (order 2). With a tuple of orders a single callable returns all of them in one pass, with the common
+        subexpressions of the function, gradient and Hessian computed once.
+
+        Parameters:
+        - expr (sp.Expr): The function, expressed as a SymPy expression of the given variables.
+        - variables (Sequence[sp.Symbol]): The variables, in the order of the components of the point vector.
+        - order (int or tuple of int): The derivative order or orders to evaluate.
+
+        Returns:
+        Callable: A function of a 1-D array returning a float, a gradient array, a Hessian matrix, or a tuple of them.
+        """
+        variables = tuple(variables)
+        key = (expr, variables, order)
+        if key in self._compiled:
+            self.hits += 1
+            self._compiled.move_to_end(key)
+            return self._compiled[key]
+        self.misses += 1
+        import sympy as sp
+
+        orders = order if isinstance(order, tuple) else (order,)
+        start_time = time.perf_counter()
+        outputs = []
+        for derivative_order in orders:
+            if derivative_order == 0:
+                outputs.append(expr)
+            elif derivative_order == 1:
+                outputs.append([sp.diff(expr, variable) for variable in variables])
+            else:
+                outputs.append(sp.hessian(expr, variables))
+        compile_time = time.perf_counter()
+        evaluate = sp.lambdify([list(variables)], outputs, 'numpy', cse=True)
+        record_phase('Symbolic', compile_time - start_time)
+        record_phase('Compile', time.perf_counter() - compile_time)
+
+        def result(point):
+            values = tuple(float(value) if derivative_order == 0 else np.asarray(value, dtype=float)
+                           for derivative_order, value in zip(orders, evaluate(point)))
+            return values if isinstance(order, tuple) else values[0]
+
+        self._store(self._compiled, key, result)
+        return result
+
+    def info(self) -> CacheInfo:
+        """Returns the hit/miss counters and the current size of the cache."""
+        return CacheInfo(self.hits, self.misses, self.max_size, len(self._compiled))
+
+    def clear(self) -> None:
+        """Drops every cached entry and resets the counters."""
+        self._derivatives.clear()
+        self._compiled.clear()
+        self.hits = 0
+        self.misses = 0
+
+    def _store(self, entries: OrderedDict, key, value) -> None:
+        entries[key] = value
+        if len(entries) > self.max_size:
+            entries.popitem(last=False)
+
+
+# Shared by every optimization method in the process
+function_cache = CompiledFunctionCache()
+
+
+def is_symbolic(expr) -> bool:
+    """Tells SymPy expressions from plain callables without importing SymPy when it is not loaded yet."""
+    sympy = sys.modules.get('sympy')
+    return sympy is not None and isinstance(expr, sympy.Basic)
+
+
+def compile_function(expr: Union[sp.Expr, Callable[[float], float]],
+                     order: Union[int, Tuple[int, ...]] = 0) -> Callable:
+    """
+    Returns the compiled derivative of the given order (or the fused callable of a tuple of orders) from the
+    process-wide cache, wrapped with the active evaluation counter when one is enabled.
+    """
+    compiled = function_cache.get(expr, order)
+    counter = active_counter()
+    return compiled if counter is None else counter.wrap(compiled, order)
+
+
+def compile_multivariate(expr: sp.Expr, variables: Sequence[sp.Symbol],
+                         order: Union[int, Tuple[int, ...]] = 0) -> Callable:
+    """
+    Returns the compiled function, gradient and/or Hessian of a function of several variables from the process-wide
+    cache, wrapped with the active evaluation counter when one is enabled.
+    """
+    compiled = function_cache.get_multivariate(expr, variables, order)
+    counter = active_counter()
+    return compiled if counter is None else counter.wrap(compiled, order, per_element=False)
+
+
+def ordered_symbols(expr: sp.Expr) -> Tuple[sp.Symbol, ...]:
+    """Returns the free symbols of the expression in natural order (x2 before x10)."""
+    return tuple(sorted(expr.free_symbols,
+                        key=lambda symbol: [int(part) if part.isdigit() else part
+                                            for part in re.split(r'(\d+)', symbol.name)]))
+
+
+class MemoizedFunction:
+    """
+    Wraps a compiled scalar function and remembers the value of every point it has already evaluated, so that probing
+    the same point twice costs a single evaluation.
+    """
+
+    def __init__(self, func: Callable):
+        self.func = func
+        self.values = {}
+
+    def __call__(self, x):
+        try:
+            return self.values[x]
+        except KeyError:
+            value = self.values[x] = self.func(x)
+            return value
+
+
+def evaluate_array(func: Callable, x: np.ndarray) -> np.ndarray:
+    """
+    Evaluates a compiled function over an array of points. Lambdified constants (e.g. the second derivative of a
+    quadratic) return a scalar, so the result is broadcast back to the shape of `x`.
+    """
+    return np.broadcast_to(np.asarray(func(x), dtype=float), x.shape)
@@ -0,0 +1,245 @@
+import csv
+import functools
+import json
+import math
+import os
+import time
+from contextlib import contextmanager
+from typing import Callable, List, Optional, Tuple, Union
+import numpy as np
+
+
+class EvaluationCounter:
+    """
+    Counts the evaluations of the objective (order 0) and of its first and second derivatives during one optimization
+    run. Calls on arrays count one evaluation per element.
+    """
+
+    def __init__(self, max_order: int = 2):
+        self.counts = [0] * (max_order + 1)
+
+    def wrap(self, func: Callable, order: Union[int, Tuple[int, ...]], per_element: bool = True) -> Callable:
+        """
+        Returns a version of the compiled function that counts its evaluations as derivatives of the given order, or of
+        each of the given orders when the callable evaluates several of them in one pass. With `per_element` disabled a
+        call counts once whatever the size of its argument (used for functions of a point vector).
+        """
+        counts = self.counts
+        orders = order if isinstance(order, tuple) else (order,)
+
+        def counted(x):
+            evaluations = np.size(x) if per_element else 1
+            for derivative_order in orders:
+                counts[derivative_order] += evaluations
+            return func(x)
+
+        return counted
+
+
+_active_counter: Optional[EvaluationCounter] = None
+
+
+def active_counter() -> Optional[EvaluationCounter]:
+    """Returns the evaluation counter of the current run, or None when counting is disabled."""
+    return _active_counter
+
+
+@contextmanager
+def count_evaluations(max_order: int = 2):
+    """
+    Enables evaluation counting for the functions compiled inside the block. Outside of it `compile_function` returns
+    the plain compiled functions, so counting costs nothing when disabled.
+    """
+    global _active_counter
+    previous = _active_counter
+    _active_counter = counter = EvaluationCounter(max_order)
+    try:
+        yield counter
+    finally:
+        _active_counter = previous
+
+
+# One row per traced iteration; 'run' indexes the labels of the traced runs and 'iteration' counts from 1 in every run
+TRACE_DTYPE = np.dtype([('run', 'i4'), ('iteration', 'i4'), ('x', 'f8'), ('f', 'f8'), ('step', 'f8'),
+                        ('width', 'f8')])
+
+
+class TraceRecorder:
+    """
+    Records the iterates of the optimization runs made while it is active: for every iteration the current estimate x,
+    f(x), the step from the previous estimate and the width of the region still searched (the bracket of the interval
+    methods, the step size of random search, NaN otherwise). The rows go into a preallocated structured array that
+    doubles in size whenever it is full.
+    """
+
+    def __init__(self, capacity: int = 1024):
+        self.labels: List[str] = []
+        self.size = 0
+        self._rows = np.empty(capacity, dtype=TRACE_DTYPE)
+
+    def start_run(self, label: str) -> Callable[..., None]:
+        """Starts the trace of a new run and returns the function recording each of its iterations."""
+        run = len(self.labels)
+        self.labels.append(label)
+        iteration = 0
+        previous_x = math.nan
+
+        def record(x: float, f: float, width: float = math.nan) -> None:
+            nonlocal iteration, previous_x
+            if self.size == len(self._rows):
+                self._rows = np.concatenate((self._rows, np.empty(len(self._rows), dtype=TRACE_DTYPE)))
+            iteration += 1
+            self._rows[self.size] = (run, iteration, x, f, x - previous_x, width)
+            self.size += 1
+            previous_x = x
+
+        return record
+
+    def to_array(self) -> np.ndarray:
+        """Returns a copy of the recorded rows as a structured array of TRACE_DTYPE."""
+        return self._rows[:self.size].copy()
+
+    def save(self, path: str) -> None:
+        """
+        Saves the trace to a CSV file with the run labels in a 'method' column when `path` ends in .csv, and otherwise
+        to a .npy file holding the structured array, with the run labels in a JSON file next to it.
+        """
+        rows = self._rows[:self.size]
+        if path.endswith('.csv'):
+            with open(path, 'w', newline='') as file:
+                writer = csv.writer(file)
+                writer.writerow(('method',) + TRACE_DTYPE.names)
+                writer.writerows((self.labels[row[0]],) + tuple(row.tolist()) for row in rows)
+        else:
+            np.save(path, rows)
+            with open(os.path.splitext(path)[0] + '.json', 'w') as labels_file:
+                json.dump(self.labels, labels_file, indent=1)
+
+
+def read_trace(path: str):
+    """Reads a trace saved by `TraceRecorder.save` into a pandas DataFrame with a 'method' column."""
+    import pandas as pd
+    if path.endswith('.csv'):
+        return pd.read_csv(path, float_precision='round_trip')
+    with open(os.path.splitext(path)[0] + '.json') as labels_file:
+        labels = json.load(labels_file)
+    rows = np.load(path)
+    trace = pd.DataFrame({name: rows[name] for name in TRACE_DTYPE.names})
+    trace.insert(0, 'method', np.array(labels, dtype=object)[rows['run']])
+    return trace
+
+
+_active_trace: Optional[TraceRecorder] = None
+
+
+def trace_run(label: str) -> Optional[Callable[..., None]]:
+    """
+    Returns the function recording the iterations of a new run when a trace is being recorded, or None. The methods
+    call it once and test the result against None in their loops, so a disabled trace costs one comparison per
+    iteration.
+    """
+    return None if _active_trace is None else _active_trace.start_run(label)
+
+
+@contextmanager
+def record_trace(capacity: int = 1024):
+    """Records the iterates of every optimization run made inside the block; see `TraceRecorder`."""
+    global _active_trace
+    previous = _active_trace
+    _active_trace = recorder = TraceRecorder(capacity)
+    try:
+        yield recorder
+    finally:
+        _active_trace = previous
+
+
+# Phases of an optimization call, in the order they run
+PHASES = ('Symbolic', 'Compile', 'Iteration', 'Finalize')
+
+
+class PhaseTimer:
+    """
+    Splits the wall time of the optimization calls made while it is active into phases: the symbolic differentiation
+    and the compilation done by the function cache on a miss (see `record_phase`), the iteration loop, and the
+    finalization after it. A call of a method decorated with `timed_phases` counts everything before its loop (cache
+    lookups and setup) as compilation; the methods mark the end of each phase with `mark`. Calls nested in another
+    decorated call count towards the phase of the outer call.
+    """
+
+    def __init__(self):
+        self.times = dict.fromkeys(PHASES, 0.0)
+        self._depth = 0
+        self._phase = 0
+        self._last = 0.0
+        # Time recorded with `add` since the last mark, which the mark does not count again
+        self._recorded = 0.0
+
+    def add(self, phase: str, seconds: float) -> None:
+        """Adds time measured separately, e.g. by the function cache, to a phase."""
+        self.times[phase] += seconds
+        self._recorded += seconds
+
+    def mark(self, phase: str) -> None:
+        """Ends a phase of the current call: the time since the previous mark goes to `phase`."""
+        now = time.perf_counter()
+        self.times[phase] += now - self._last - self._recorded
+        self._last, self._recorded = now, 0.0
+        self._phase = PHASES.index(phase) + 1
+
+    def enter(self) -> None:
+        self._depth += 1
+        if self._depth == 1:
+            self._phase = PHASES.index('Compile')
+            self._last, self._recorded = time.perf_counter(), 0.0
+
+    def exit(self) -> None:
+        if self._depth == 1:
+            # The rest of the call, e.g. after an early return from the loop, belongs to the phase it was in
+            self.mark(PHASES[min(self._phase, len(PHASES) - 1)])
+        self._depth -= 1
+
+
+_active_phase_timer: Optional[PhaseTimer] = None
+
+
+def timed_phases(method: Callable) -> Callable:
+    """Decorates an optimization method so that its calls are split into phases while a PhaseTimer is active."""
+    @functools.wraps(method)
+    def timed(*args, **kwargs):
+        timer = _active_phase_timer
+        if timer is None:
+            return method(*args, **kwargs)
+        timer.enter()
+        try:
+            return method(*args, **kwargs)
+        finally:
+            timer.exit()
+
+    return timed
+
+
+def phase_timer() -> Optional[PhaseTimer]:
+    """
+    Returns the active phase timer inside the outermost call of a method decorated with `timed_phases`, or None. Like
+    `trace_run`, the methods call it once and mark the phases only when the result is not None.
+    """
+    timer = _active_phase_timer
+    return timer if timer is not None and timer._depth == 1 else None
+
+
+def record_phase(phase: str, seconds: float) -> None:
+    """Adds time measured outside of the methods (symbolic differentiation, compilation) to the active phase timer."""
+    if _active_phase_timer is not None:
+        _active_phase_timer.add(phase, seconds)
+
+
+@contextmanager
+def time_phases():
+    """Splits the time of every optimization call made inside the block into phases; see `PhaseTimer`."""
+    global _active_phase_timer
+    previous = _active_phase_timer
+    _active_phase_timer = timer = PhaseTimer()
+    try:
+        yield timer
+    finally:
+        _active_phase_timer = previous
@@ -0,0 +1,165 @@
+from typing import Callable, Tuple
+import numpy as np
+
+
+def backtrack(fun: Callable, uk, f_uk: float, grad_val, grad_norm_sq: float, step_size: float, alpha: float,
+              beta: float) -> Tuple[float, float]:
+    """
+    Armijo backtracking along the negative gradient: shrinks the step by `beta` until the sufficient decrease condition
+    holds. The function value at the current point and the squared gradient norm are passed in, so every inner step
+    costs a single evaluation.
+
+    Returns:
+    Tuple[float, float]: The accepted step size and the function value at the new point.
+    """
+    f_new = fun(uk - step_size * grad_val)
+    while f_new > f_uk - alpha * step_size * grad_norm_sq:
+        step_size *= beta
+        f_new = fun(uk - step_size * grad_val)
+    return step_size, f_new
+
+
+class ArmijoBacktracking:
+    """
+    Armijo backtracking restarted from a unit step on every iteration. It accepts exactly the same steps as the
+    original loop of `gradient_method`, without re-evaluating f(uk) and the gradient norm on every inner step.
+    """
+
+    def __init__(self, alpha: float = 0.01, beta: float = 0.5):
+        self.alpha = alpha
+        self.beta = beta
+
+    def __call__(self, fun: Callable, gradient_fun: Callable, uk, f_uk: float, grad_val) -> Tuple[float, float]:
+        grad_norm_sq = np.square(np.linalg.norm(grad_val))
+        return backtrack(fun, uk, f_uk, grad_val, grad_norm_sq, 1.0, self.alpha, self.beta)
+
+
+class WarmStartBacktracking(ArmijoBacktracking):
+    """
+    Armijo backtracking that starts from the previously accepted step enlarged by 1 / beta instead of from a unit step,
+    so slowly varying step sizes are found with one or two evaluations.
+    """
+
+    def __init__(self, alpha: float = 0.01, beta: float = 0.5):
+        super().__init__(alpha, beta)
+        self.previous_step = None
+
+    def __call__(self, fun: Callable, gradient_fun: Callable, uk, f_uk: float, grad_val) -> Tuple[float, float]:
+        grad_norm_sq = np.square(np.linalg.norm(grad_val))
+        initial_step = 1.0 if self.previous_step is None else self.previous_step / self.beta
+        self.previous_step, f_new = backtrack(fun, uk, f_uk, grad_val, grad_norm_sq, initial_step, self.alpha,
+                                              self.beta)
+        return self.previous_step, f_new
+
+
+class BarzilaiBorwein(ArmijoBacktracking):
+    """
+    Barzilai-Borwein step sizes s.s / s.y computed from the last two iterates and gradients, safeguarded by Armijo
+    backtracking so that the method cannot diverge on non-convex functions. The first iteration uses a unit step.
+    """
+
+    def __init__(self, alpha: float = 0.01, beta: float = 0.5, min_step: float = 1e-10, max_step: float = 1e10):
+        super().__init__(alpha, beta)
+        self.min_step = min_step
+        self.max_step = max_step
+        self.previous_point = None
+        self.previous_gradient = None
+
+    def __call__(self, fun: Callable, gradient_fun: Callable, uk, f_uk: float, grad_val) -> Tuple[float, float]:
+        initial_step = 1.0
+        if self.previous_point is not None:
+            s = np.asarray(uk - self.previous_point, dtype=float)
+            y = np.asarray(grad_val - self.previous_gradient, dtype=float)
+            curvature = np.dot(np.ravel(s), np.ravel(y))
+            if np.isfinite(curvature) and curvature > 0:
+                initial_step = float(np.clip(np.dot(np.ravel(s), np.ravel(s)) / curvature, self.min_step,
+                                             self.max_step))
+        self.previous_point = uk
+        self.previous_gradient = grad_val
+
+        grad_norm_sq = np.square(np.linalg.norm(grad_val))
+        return backtrack(fun, uk, f_uk, grad_val, grad_norm_sq, initial_step, self.alpha, self.beta)
+
+
+class StrongWolfe:
+    """
+    Line search satisfying the strong Wolfe conditions (Nocedal & Wright, algorithms 3.5 and 3.6): the trial step is
+    expanded until the minimum along the negative gradient is bracketed, then the bracket is zoomed with safeguarded
+    quadratic interpolation. When the zoom cannot find an acceptable step (typically when the function is flat to
+    machine precision), it falls back to Armijo backtracking so that the iteration never stalls on a zero step.
+    """
+
+    def __init__(self, alpha: float = 0.01, beta: float = 0.5, c2: float = 0.9, max_evaluations: int = 30):
+        """
+        Parameters:
+        - alpha (float): The sufficient decrease coefficient (c1).
+        - beta (float): The reduction factor of the backtracking fallback.
+        - c2 (float): The curvature condition coefficient.
+        - max_evaluations (int): The maximum number of trial steps per line search.
+        """
+        self.c1 = alpha
+        self.beta = beta
+        self.c2 = c2
+        self.max_evaluations = max_evaluations
+
+    def __call__(self, fun: Callable, gradient_fun: Callable, uk, f_uk: float, grad_val) -> Tuple[float, float]:
+        direction = -grad_val
+
+        def phi(t):
+            return fun(uk + t * direction)
+
+        def dphi(t):
+            return np.dot(np.ravel(gradient_fun(uk + t * direction)), np.ravel(direction))
+
+        dphi_0 = -np.square(np.linalg.norm(grad_val))
+        step_size, f_new = self._search(phi, dphi, f_uk, dphi_0)
+        if step_size == 0:
+            return backtrack(fun, uk, f_uk, grad_val, -dphi_0, 1.0, self.c1, self.beta)
+        return step_size, f_new
+
+    def _search(self, phi, dphi, f_uk, dphi_0) -> Tuple[float, float]:
+        t_previous, phi_previous, dphi_previous = 0.0, f_uk, dphi_0
+        t = 1.0
+        for evaluation in range(self.max_evaluations):
+            phi_t = phi(t)
+            # Written as "not <=" so that a NaN trial value (outside the function's domain) also shrinks the step
+            if not phi_t <= f_uk + self.c1 * t * dphi_0 or (evaluation > 0 and phi_t >= phi_previous):
+                return self._zoom(phi, dphi, f_uk, dphi_0, t_previous, phi_previous, dphi_previous, t, phi_t)
+            dphi_t = dphi(t)
+            if abs(dphi_t) <= -self.c2 * dphi_0:
+                return t, phi_t
+            if dphi_t >= 0:
+                return self._zoom(phi, dphi, f_uk, dphi_0, t, phi_t, dphi_t, t_previous, phi_previous)
+            t_previous, phi_previous, dphi_previous = t, phi_t, dphi_t
+            t *= 2
+        return t_previous, phi_previous
+
+    def _zoom(self, phi, dphi, f_uk, dphi_0, t_low, phi_low, dphi_low, t_high, phi_high) -> Tuple[float, float]:
+        for _ in range(self.max_evaluations):
+            width = t_high - t_low
+            # Minimizer of the quadratic through phi(t_low), phi'(t_low) and phi(t_high)
+            denominator = 2 * (phi_high - phi_low - dphi_low * width)
+            t = t_low - dphi_low * width ** 2 / denominator if denominator != 0 else np.nan
+            low, high = sorted((t_low, t_high))
+            if not np.isfinite(t) or not low + 0.1 * abs(width) <= t <= high - 0.1 * abs(width):
+                t = (t_low + t_high) / 2
+
+            phi_t = phi(t)
+            if not phi_t <= f_uk + self.c1 * t * dphi_0 or phi_t >= phi_low:
+                t_high, phi_high = t, phi_t
+            else:
+                dphi_t = dphi(t)
+                if abs(dphi_t) <= -self.c2 * dphi_0:
+                    return t, phi_t
+                if dphi_t * (t_high - t_low) >= 0:
+                    t_high, phi_high = t_low, phi_low
+                t_low, phi_low, dphi_low = t, phi_t, dphi_t
+        return t_low, phi_low
+
+
+LINE_SEARCHES = {
+    'armijo': ArmijoBacktracking,
+    'warm-start': WarmStartBacktracking,
+    'barzilai-borwein': BarzilaiBorwein,
+    'wolfe': StrongWolfe,
+}
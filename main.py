@@ -1,14 +1,181 @@
-import multi_optimization
-import Graph_plotting
-import Data_analysis
-import Data_analysis2
+import argparse
+import importlib
+import sys
+import time
 
+# Time spent in the first import of every stage module, filled in by `load`
+_import_times = {}
 
-def main():
-    multi_optimization.main()
-    Graph_plotting.main()
-    Data_analysis.main()
-    Data_analysis2.main()
+
+def load(module_name):
+    """
+    Imports a stage module on demand, so that every subcommand only pays for the dependencies it uses (SymPy for the
+    sweep, pandas and matplotlib for the plots, SciPy and statsmodels for the analysis), and records the import time.
+    """
+    if module_name in sys.modules:
+        return sys.modules[module_name]
+    start_time = time.perf_counter()
+    module = importlib.import_module(module_name)
+    _import_times[module_name] = time.perf_counter() - start_time
+    return module
+
+
+def benchmark_settings(arguments):
+    return load('benchmark').BenchmarkSettings(arguments.warmup, arguments.repeats, not arguments.keep_gc)
+
+
+def sweep(arguments):
+    load('multi_optimization').main(arguments.workers or None, arguments.chunksize, arguments.resume, arguments.store,
+                                    benchmark_settings(arguments), arguments.file, arguments.csv, arguments.ladder,
+                                    arguments.profile)
+
+
+def plot(arguments):
+    load('Graph_plotting').main(arguments.file, arguments.plot_workers, arguments.show, arguments.trace)
+    load('Data_analysis2').main(arguments.file, arguments.plot_workers, arguments.show)
+
+
+def analyze(arguments):
+    load('Data_analysis').main(arguments.file, arguments.resamples, arguments.seed, arguments.bootstrap_workers)
+
+
+def export(arguments):
+    rows = load('columnar_results').export_csv(arguments.file, arguments.csv)
+    print(f"Exported {rows} rows to {arguments.csv}")
+
+
+def bench(arguments):
+    """Times a single method on a single test function of the sweep and prints its result and evaluation counts."""
+    multi_optimization = load('multi_optimization')
+    func = multi_optimization.define_functions()[arguments.function]
+    if arguments.interval is not None:
+        calls = multi_optimization.interval_method_calls(tuple(arguments.interval), arguments.precision)
+    else:
+        calls = multi_optimization.point_method_calls(arguments.point, arguments.precision, arguments.max_iterations)
+    if arguments.method not in calls:
+        sys.exit(f"Unknown method '{arguments.method}', expected one of: {', '.join(calls)}")
+
+    method, args, kwargs = calls[arguments.method]
+    result = multi_optimization.run_optimization(func, method, *args, benchmark_settings=benchmark_settings(arguments),
+                                                 **kwargs)
+    for field, value in zip(multi_optimization.RESULT_FIELDS, result):
+        print(f"{field}: {value}")
+
+    if arguments.trace is not None:
+        # One more run, outside of the timed ones, records the iterates
+        with load('instrumentation').record_trace() as trace:
+            method(func, *args, **kwargs)
+        trace.save(arguments.trace)
+        print(f"Trace of {trace.size} iterations written to {arguments.trace}")
+
+
+def run_all(arguments):
+    """Runs every stage in order, like the original pipeline."""
+    sweep(arguments)
+    plot(arguments)
+    analyze(arguments)
+
+
+def add_benchmark_arguments(parser):
+    parser.add_argument('--warmup', type=int, default=1, help='number of untimed warmup runs of every cell')
+    parser.add_argument('--repeats', type=int, default=5, help='number of timed runs of every cell')
+    parser.add_argument('--keep-gc', action='store_true', help='leave the garbage collector enabled while timing')
+
+
+def add_sweep_arguments(parser):
+    parser.add_argument('--workers', type=int, default=1,
+                        help='number of worker processes (0 uses every CPU core, 1 runs serially)')
+    parser.add_argument('--chunksize', type=int, default=8, help='number of tasks sent to a worker at once')
+    parser.add_argument('--resume', action='store_true',
+                        help='reuse the results already recorded in the result store instead of recomputing them')
+    parser.add_argument('--store', default='optimization_store.sqlite', help='path to the result store')
+    parser.add_argument('--csv', default=None, help='also write the results to this CSV file')
+    parser.add_argument('--ladder', action='store_true',
+                        help='run the precisions of every cell from the coarsest to the finest, each starting from '
+                             'the previous result, and report cumulative times and iterations')
+    parser.add_argument('--profile', default=None, metavar='DIR',
+                        help='also run every computed cell once under cProfile and dump its profile to this directory')
+    add_benchmark_arguments(parser)
+
+
+def add_plot_arguments(parser):
+    parser.add_argument('--plot-workers', type=int, default=None,
+                        help='number of figure rendering processes (default: every CPU core)')
+    parser.add_argument('--show', action='store_true',
+                        help='show every figure interactively instead of rendering them headless')
+    parser.add_argument('--trace', default=None,
+                        help='also plot the convergence of the trace file written by `bench --trace`')
+
+
+def add_analysis_arguments(parser):
+    parser.add_argument('--resamples', type=int, default=10000, help='number of bootstrap resamples')
+    parser.add_argument('--seed', type=int, default=0, help='root seed of the bootstrap resampling')
+    parser.add_argument('--bootstrap-workers', type=int, default=None,
+                        help='number of bootstrap processes (default: every CPU core)')
+
+
+RESULT_FILE_HELP = 'the columnar result file written by the sweep (a CSV file is also accepted for reading)'
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description='Optimization methods comparison pipeline.')
+    parser.add_argument('--import-times', action='store_true',
+                        help='report the time spent importing every stage module (cold-start latency)')
+    parser.add_argument('--file', default='optimization_results2.npy', help=RESULT_FILE_HELP)
+    parser.set_defaults(handler=run_all)
+    # The stages that read or write the result file also accept --file after their name; without it the top-level
+    # option (or its default) applies
+    stage_options = argparse.ArgumentParser(add_help=False)
+    stage_options.add_argument('--file', default=argparse.SUPPRESS, help=RESULT_FILE_HELP)
+    subparsers = parser.add_subparsers(title='stages')
+
+    sweep_parser = subparsers.add_parser('sweep', parents=[stage_options], help='run the optimization sweep')
+    add_sweep_arguments(sweep_parser)
+    sweep_parser.set_defaults(handler=sweep)
+
+    plot_parser = subparsers.add_parser('plot', parents=[stage_options], help='draw the plots of the sweep results')
+    add_plot_arguments(plot_parser)
+    plot_parser.set_defaults(handler=plot)
+    analyze_parser = subparsers.add_parser('analyze', parents=[stage_options],
+                                           help='run the statistical tests on the sweep results')
+    add_analysis_arguments(analyze_parser)
+    analyze_parser.set_defaults(handler=analyze)
+
+    export_parser = subparsers.add_parser('export', parents=[stage_options],
+                                          help='export the columnar result file to CSV')
+    export_parser.add_argument('--csv', default='optimization_results2.csv', help='the CSV file to write')
+    export_parser.set_defaults(handler=export)
+
+    bench_parser = subparsers.add_parser('bench', help='time one method on one test function')
+    bench_parser.add_argument('function', help="the test function name, e.g. 'Quadratic 1'")
+    bench_parser.add_argument('method', help='the method name, e.g. GoldenRatio or Newton')
+    start = bench_parser.add_mutually_exclusive_group()
+    start.add_argument('--interval', type=float, nargs=2, metavar=('LOWER', 'UPPER'), help='the initial interval')
+    start.add_argument('--point', type=float, default=1.0, help='the initial point of the point methods')
+    bench_parser.add_argument('--precision', type=float, default=1e-6, help='the tolerance of the method')
+    bench_parser.add_argument('--max-iterations', type=int, default=1000, help='the iteration limit of point methods')
+    bench_parser.add_argument('--trace', default=None,
+                              help='record the iterates of one more run to this .npy or .csv file')
+    add_benchmark_arguments(bench_parser)
+    bench_parser.set_defaults(handler=bench)
+    return parser
+
+
+def main(argv=None):
+    arguments = build_parser().parse_args(argv)
+    if arguments.handler is run_all:
+        # The stages share the defaults of the stage options when no subcommand is given
+        defaults = argparse.ArgumentParser()
+        add_sweep_arguments(defaults)
+        add_plot_arguments(defaults)
+        add_analysis_arguments(defaults)
+        arguments = argparse.Namespace(**{**vars(defaults.parse_args([])), **vars(arguments)})
+    arguments.handler(arguments)
+
+    if arguments.import_times:
+        print("Import times:")
+        for module_name, seconds in sorted(_import_times.items(), key=lambda item: -item[1]):
+            print(f"  {module_name}: {seconds * 1000:.1f} ms")
 
 
 if __name__ == '__main__':
@@ -1,7 +1,18 @@
-import time
+import math
+import os
+import re
+from collections import deque
+from contextlib import ExitStack
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
 import sympy as sp
 from PointOptimizationMethods import PointOptimizationMethods
 from IntervalOptimizationMethods import IntervalOptimizationMethods
+from function_cache import compile_function, function_cache
+from result_store import ResultStore, method_version, task_key
+from benchmark import BenchmarkSettings, benchmark
+from columnar_results import RESULT_COLUMNS, ColumnarResultWriter, csv_row
+from instrumentation import PHASES, time_phases
 import csv
 
 
@@ -33,6 +44,21 @@ def define_functions():
     }
 
 
+def define_multivariate_functions(n=10):
+    """
+    Defines the multivariate test functions of n variables x0, ..., x(n-1). They are kept apart from
+    `define_functions`, whose one-dimensional functions are swept by the scalar methods.
+    """
+    x = sp.symbols(f'x0:{n}')
+    return {
+        'Sphere': sum(xi ** 2 for xi in x),
+        'Weighted Sphere': sum((i + 1) * (xi - 1) ** 2 for i, xi in enumerate(x)),
+        'Trid': sum((xi - 1) ** 2 for xi in x) - sum(x[i] * x[i - 1] for i in range(1, n)),
+        'Rosenbrock': sum(100 * (x[i + 1] - x[i] ** 2) ** 2 + (1 - x[i]) ** 2 for i in range(n - 1)),
+        'Log-Sum-Exp': sp.log(sum(sp.exp(xi) + sp.exp(-xi) for xi in x)),
+    }
+
+
 def define_function_types():
     return {
         'Quadratic': ['Quadratic 1', 'Quadratic 2', 'Quadratic 3', 'Quadratic 4', 'Quadratic 5'],
@@ -54,52 +80,396 @@ def perform_optimizations(test_functions, initial_intervals, initial_points, pre
     return interval_results, point_results
 
 
+def interval_method_calls(interval, precision):
+    """Returns the interval methods of the sweep as {name: (method, args, kwargs)} for one interval and precision."""
+    return {
+        'GoldenRatio': (IntervalOptimizationMethods.golden_ratio_optimization, (*interval,), {'tolerance': precision}),
+        'Fibonacci': (IntervalOptimizationMethods.fibonacci_optimization, (*interval,), {'tolerance': precision}),
+        'Bisection': (IntervalOptimizationMethods.bisection_optimization, (*interval,),
+                      {'delta': 0.1, 'tolerance': precision}),
+        'Brent': (IntervalOptimizationMethods.brent_optimization, (*interval,), {'tolerance': precision}),
+        'Global': (IntervalOptimizationMethods.global_optimization, (*interval,),
+                   {'tolerance': precision, 'return_local_minima': False}),
+        # The same methods, started from the bracket found by IntervalOptimizationMethods.find_bracket
+        'GoldenBracket': (IntervalOptimizationMethods.golden_ratio_optimization, (*interval,),
+                          {'tolerance': precision, 'bracket': True}),
+        'FibonacciBracket': (IntervalOptimizationMethods.fibonacci_optimization, (*interval,),
+                             {'tolerance': precision, 'bracket': True}),
+        'BisectionBracket': (IntervalOptimizationMethods.bisection_optimization, (*interval,),
+                             {'delta': 0.1, 'tolerance': precision, 'bracket': True}),
+    }
+
+
+RANDOM_SEARCH_SEED = 0
+
+
+def point_method_calls(point, precision, max_iterations):
+    """Returns the point methods of the sweep as {name: (method, args, kwargs)} for one start point and precision."""
+    return {
+        'Newton': (PointOptimizationMethods.newtons_method, (point, precision, max_iterations), {}),
+        'Gradient': (PointOptimizationMethods.gradient_method, (point, max_iterations, precision), {}),
+        'Random': (PointOptimizationMethods.random_search, (point, precision, 1, max_iterations), {}),
+        # Seeded, so that every row of the batched search can be replayed exactly
+        'BatchRandom': (PointOptimizationMethods.batch_random_search, (point, precision, 1, max_iterations),
+                        {'seed': RANDOM_SEARCH_SEED}),
+        # Golden ratio search on the bracket found around the start point
+        'GoldenFromStart': (IntervalOptimizationMethods.golden_ratio_optimization, (None, None, precision),
+                            {'x0': point}),
+    }
+
+
 def run_interval_optimizations(func, results_dict, intervals, precision):
     for interval in intervals:
         results_dict[interval] = {}
-        results_dict[interval]['GoldenRatio'] = run_optimization(func,
-                                                                 IntervalOptimizationMethods.golden_ratio_optimization,
-                                                                 *interval, tolerance=precision)
-        results_dict[interval]['Fibonacci'] = run_optimization(func, IntervalOptimizationMethods.fibonacci_optimization,
-                                                               *interval, tolerance=precision)
-        results_dict[interval]['Bisection'] = run_optimization(func, IntervalOptimizationMethods.bisection_optimization,
-                                                               *interval, delta=0.1, tolerance=precision)
+        for method_name, (method, args, kwargs) in interval_method_calls(interval, precision).items():
+            results_dict[interval][method_name] = run_optimization(func, method, *args, **kwargs)
 
 
 def run_point_optimizations(func, results_dict, points, tolerance, max_iterations):
     for point in points:
         results_dict[point] = {}
-        results_dict[point]['Newton'] = run_optimization(func, PointOptimizationMethods.newtons_method, point,
-                                                         tolerance, max_iterations)
-        results_dict[point]['Gradient'] = run_optimization(func, PointOptimizationMethods.gradient_method, point,
-                                                           max_iterations, tolerance)
-        results_dict[point]['Random'] = run_optimization(func, PointOptimizationMethods.random_search, point, tolerance,
-                                                         1, max_iterations)
+        for method_name, (method, args, kwargs) in point_method_calls(point, tolerance, max_iterations).items():
+            results_dict[point][method_name] = run_optimization(func, method, *args, **kwargs)
+
+
+# Fields of the timed result tuple returned by run_optimization
+RESULT_FIELDS = ['Optimal x', 'Function Value', 'Iterations', 'Result', 'Time', 'Time Min', 'Time IQR', 'Repeats',
+                 'f Evaluations', "f' Evaluations", "f'' Evaluations", 'Symbolic Time', 'Compile Time',
+                 'Iteration Time', 'Finalize Time']
+# Fields appended to the result of every rung of a precision ladder by run_ladder
+LADDER_FIELDS = ['Cumulative Time', 'Cumulative Iterations']
+
+
+def iter_tasks(test_functions, initial_intervals, initial_points, precisions, max_iterations):
+    """
+    Lazily splits the sweep grid into independent tasks, one per (function, parameter, method, precision) cell, in the
+    order in which the results are written. Each task is an (optimization type, function name, parameter, method name,
+    precision) tuple.
+    """
+    for precision in precisions:
+        for name in test_functions:
+            for interval in initial_intervals:
+                for method_name in interval_method_calls(interval, precision):
+                    yield 'Interval', name, interval, method_name, precision
+    for precision in precisions:
+        for name in test_functions:
+            for point in initial_points:
+                for method_name in point_method_calls(point, precision, max_iterations):
+                    yield 'Point', name, point, method_name, precision
+
+
+def iter_ladder_tasks(test_functions, initial_intervals, initial_points, precisions, max_iterations):
+    """
+    Like `iter_tasks`, but with a single precision ladder task per (function, parameter, method) instead of one task
+    per precision. The precision of a ladder task is the tuple of its precisions, from the coarsest to the finest, and
+    its rungs are run in this order by `run_ladder`.
+    """
+    precisions = tuple(sorted(precisions, reverse=True))
+    for name in test_functions:
+        for interval in initial_intervals:
+            for method_name in interval_method_calls(interval, precisions[0]):
+                yield 'Interval', name, interval, method_name, precisions
+    for name in test_functions:
+        for point in initial_points:
+            for method_name in point_method_calls(point, precisions[0], max_iterations):
+                yield 'Point', name, point, method_name, precisions
+
+
+def is_ladder_task(task):
+    return isinstance(task[4], tuple)
+
+
+def ladder_rungs(task):
+    """Returns the single-precision task cells of a precision ladder task, in the order they are run."""
+    optimization_type, name, param, method_name, precisions = task
+    return [(optimization_type, name, param, method_name, precision) for precision in precisions]
+
+
+def task_call(task, max_iterations):
+    """Returns the (method, args, kwargs) call of a single task cell."""
+    optimization_type, _, param, method_name, precision = task
+    if optimization_type == 'Interval':
+        calls = interval_method_calls(param, precision)
+    else:
+        calls = point_method_calls(param, precision, max_iterations)
+    return calls[method_name]
+
+
+def warm_start_call(task, x, previous_precision, max_iterations):
+    """
+    Returns the call of a rung of a precision ladder. Without a usable minimum `x` of the previous (coarser) rung (None
+    when that rung failed) this is the task's own call. Otherwise the method starts from that minimum: the point
+    methods from that point (a bracket search from it takes first steps of `previous_precision`), the interval methods
+    on the interval of half-width `previous_precision` around it, which holds the final interval of the previous rung,
+    clipped to the initial interval, and which is therefore searched without a bracket search. That interval holds a
+    single basin, so the global search only refines it instead of sampling a grid.
+    """
+    optimization_type, _, param, method_name, precision = task
+    if x is None or not math.isfinite(x):
+        return task_call(task, max_iterations)
+    if optimization_type == 'Point':
+        method, args, kwargs = point_method_calls(x, precision, max_iterations)[method_name]
+        return method, args, {**kwargs, 'bracket_step': previous_precision} if 'x0' in kwargs else kwargs
+    lower_bound, upper_bound = min(param), max(param)
+    interval = (max(x - previous_precision, lower_bound), min(x + previous_precision, upper_bound))
+    method, args, kwargs = interval_method_calls(interval, precision)[method_name]
+    if method is IntervalOptimizationMethods.global_optimization:
+        # The endpoints and the midpoint, i.e. one basin refined over the whole interval
+        return method, args, {**kwargs, 'grid_points': 3}
+    return method, args, {**kwargs, 'bracket': False} if 'bracket' in kwargs else kwargs
+
+
+def run_ladder(func, task, max_iterations, settings=BenchmarkSettings()):
+    """
+    Runs a precision ladder task (see `iter_ladder_tasks`), warm-starting every rung from the result of the previous
+    one (see `warm_start_call`). A rung after a failed one starts cold, since a failed result holds no minimum to start
+    from (the gradient method even returns x=0). The interval methods would judge a warm-started rung against its
+    narrow interval, so the status is judged against the initial interval instead, with the usual boundary rule.
 
+    Returns:
+    list: The timed result of every rung (see RESULT_FIELDS) followed by the time and the iterations accumulated over
+    the rungs up to and including it (see LADDER_FIELDS).
+    """
+    results = []
+    x = previous_precision = None
+    cumulative_time = cumulative_iterations = 0
+    for rung in ladder_rungs(task):
+        optimization_type, _, param, _, precision = rung
+        method, args, kwargs = warm_start_call(rung, x, previous_precision, max_iterations)
+        result = run_optimization(func, method, *args, benchmark_settings=settings, **kwargs)
+        warm_started = x is not None and math.isfinite(x)
+        if optimization_type == 'Interval' and warm_started and result[0] is not None:
+            at_boundary = IntervalOptimizationMethods.is_boundary_minimum(result[0], min(param), max(param), precision)
+            result = result[:3] + ("Failure" if at_boundary else "Success",) + result[4:]
+        x = result[0] if result[3] == "Success" else None
+        previous_precision = precision
+        cumulative_time += result[4]
+        cumulative_iterations += result[2] or 0
+        results.append(result + (cumulative_time, cumulative_iterations))
+    return results
 
-def run_optimization(func, method, *args, **kwargs):
-    start_time = time.time()
-    result = method(func, *args, **kwargs)  # Ensure args are correctly passed
-    elapsed_time = time.time() - start_time
-    return result + (elapsed_time,)
+
+def run_task(func, task, max_iterations, settings=BenchmarkSettings(), profile_dir=None):
+    """
+    Runs the optimization of a single task cell and returns the timed result, or the list of the results of every
+    rung of a precision ladder task. With a `profile_dir` the task is then profiled as well (see `profile_task`).
+    """
+    if is_ladder_task(task):
+        result = run_ladder(func, task, max_iterations, settings)
+    else:
+        method, args, kwargs = task_call(task, max_iterations)
+        result = run_optimization(func, method, *args, benchmark_settings=settings, **kwargs)
+    if profile_dir is not None:
+        profile_task(func, task, max_iterations, profile_dir, result)
+    return result
+
+
+def profile_path(task, profile_dir):
+    """Returns the path of the profile of a task, named after its type, function, parameter, method and precision."""
+    return os.path.join(profile_dir, re.sub(r'[^\w.-]+', '_', ' '.join(map(str, task))).strip('_') + '.prof')
+
+
+def profile_task(func, task, max_iterations, profile_dir, result):
+    """
+    Runs a task cell once more under cProfile, outside of the timed runs, and dumps the profile to `profile_dir` (see
+    `profile_path`); it can be read with `pstats`. The rungs of a precision ladder task are profiled together, each
+    with the call `run_ladder` made: warm-started from the previous rung of `result`, the rung results returned by
+    `run_task`.
+    """
+    import cProfile
+    profiler = cProfile.Profile()
+    if is_ladder_task(task):
+        x = previous_precision = None
+        for rung, rung_result in zip(ladder_rungs(task), result):
+            method, args, kwargs = warm_start_call(rung, x, previous_precision, max_iterations)
+            profiler.runcall(method, func, *args, **kwargs)
+            x = rung_result[0] if rung_result[3] == "Success" else None
+            previous_precision = rung[4]
+    else:
+        method, args, kwargs = task_call(task, max_iterations)
+        profiler.runcall(method, func, *args, **kwargs)
+    profiler.dump_stats(profile_path(task, profile_dir))
+
+
+def stored_task_key(func, task, max_iterations, settings=BenchmarkSettings()):
+    """Returns the result store key of a single task cell or precision ladder task."""
+    if is_ladder_task(task):
+        method, args, kwargs = task_call(ladder_rungs(task)[0], max_iterations)
+        context = (tuple(settings) + tuple(RESULT_FIELDS + LADDER_FIELDS)
+                   + (method_version(run_ladder), method_version(warm_start_call)))
+        return task_key(func, method, args, kwargs, task[4], context)
+    method, args, kwargs = task_call(task, max_iterations)
+    return task_key(func, method, args, kwargs, task[4], tuple(settings) + tuple(RESULT_FIELDS))
+
+
+# The derivative orders the sweep methods request from the compiled-function cache: f, f' (gradient method) and the
+# fused (f', f'') callable of Newton's method
+COMPILED_ORDERS = (0, 1, (1, 2))
+
+_worker_functions = {}
+_worker_max_iterations = None
+_worker_settings = BenchmarkSettings()
+_worker_profile_dir = None
+# Symbolic and compile times of the cache warm-up of every function, not yet reported with a task
+_worker_warmup_phases = {}
+
+
+def _init_worker(test_functions, max_iterations, settings, profile_dir=None):
+    """
+    Stores the sweep settings in the worker process and warms its own compiled-function cache. The tasks would then
+    never pay for symbolic differentiation and compilation, so the time the warm-up spent on them for every function
+    is kept and added to the first task of that function the worker runs, as in a serial sweep.
+    """
+    global _worker_functions, _worker_max_iterations, _worker_settings, _worker_profile_dir
+    _worker_functions = test_functions
+    _worker_max_iterations = max_iterations
+    _worker_settings = settings
+    _worker_profile_dir = profile_dir
+    for name, func in test_functions.items():
+        with time_phases() as phases:
+            for order in COMPILED_ORDERS:
+                compile_function(func, order)
+        _worker_warmup_phases[name] = (phases.times['Symbolic'], phases.times['Compile'])
+
+
+def with_warmup_phases(result, symbolic_time, compile_time):
+    """
+    Adds symbolic and compile times spent outside of a task to its timed result, or to the first rung of a precision
+    ladder task.
+    """
+    if isinstance(result, list):
+        return [with_warmup_phases(result[0], symbolic_time, compile_time)] + result[1:]
+    symbolic_index = RESULT_FIELDS.index('Symbolic Time')
+    compile_index = RESULT_FIELDS.index('Compile Time')
+    return (result[:symbolic_index] + (result[symbolic_index] + symbolic_time, result[compile_index] + compile_time)
+            + result[compile_index + 1:])
+
+
+def _run_worker_chunk(tasks):
+    results = []
+    for task in tasks:
+        result = run_task(_worker_functions[task[1]], task, _worker_max_iterations, _worker_settings,
+                          _worker_profile_dir)
+        if task[1] in _worker_warmup_phases:
+            result = with_warmup_phases(result, *_worker_warmup_phases.pop(task[1]))
+        results.append(result)
+    return results
+
+
+def iter_results(tasks, test_functions, max_iterations, workers=1, chunksize=8, store=None, resume=False,
+                 settings=BenchmarkSettings(), profile_dir=None):
+    """
+    Runs the tasks and yields (task, result) pairs in task order as soon as they complete. With more than one worker
+    the tasks are sent to a process pool in chunks, keeping only a bounded window of chunks in flight so that an
+    arbitrarily long task generator is consumed in constant memory.
+
+    Every computed result is recorded in `store` (a `ResultStore`) when one is given; with `resume` the cells already
+    present in the store are yielded from it instead of being recomputed. `settings` controls the warmup and repeats of
+    every timed cell. With a `profile_dir` every computed cell is also profiled (see `profile_task`).
+    """
+    def lookup(chunk):
+        keys = [stored_task_key(test_functions[task[1]], task, max_iterations, settings) if store is not None else None
+                for task in chunk]
+        cached = [store.get(key) if resume and store is not None else None for key in keys]
+        return keys, cached
+
+    def record(key, result):
+        if store is not None:
+            store.put(key, result)
+
+    if workers == 1:
+        for task in tasks:
+            (key,), (result,) = lookup([task])
+            if result is None:
+                result = run_task(test_functions[task[1]], task, max_iterations, settings, profile_dir)
+                record(key, result)
+            yield task, result
+        return
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(test_functions, max_iterations, settings, profile_dir)) as executor:
+        window = 4 * (workers or os.cpu_count())
+        pending = deque()
+        tasks = iter(tasks)
+        while True:
+            chunk = list(islice(tasks, chunksize))
+            if chunk:
+                keys, cached = lookup(chunk)
+                missing = [task for task, result in zip(chunk, cached) if result is None]
+                future = executor.submit(_run_worker_chunk, missing) if missing else None
+                pending.append((chunk, keys, cached, future))
+            if pending and (not chunk or len(pending) >= window):
+                done_chunk, keys, cached, future = pending.popleft()
+                computed = iter(future.result() if future is not None else [])
+                for task, key, result in zip(done_chunk, keys, cached):
+                    if result is None:
+                        result = next(computed)
+                        record(key, result)
+                    yield task, result
+            if not chunk and not pending:
+                break
+
+
+def run_optimization(func, method, *args, benchmark_settings=BenchmarkSettings(), **kwargs):
+    """
+    Runs the method with warmup and repeated timing and returns its result followed by the median, minimum and
+    interquartile range of the time, the number of timed repeats, the number of evaluations of f, f' and f'', and the
+    time of each phase of the method (see RESULT_FIELDS).
+    """
+    result, timing, counter, phase_times = benchmark(func, method, *args, settings=benchmark_settings, **kwargs)
+    return (result + (timing.median, timing.min, timing.iqr, timing.repeats) + tuple(counter.counts)
+            + tuple(phase_times[phase] for phase in PHASES))
+
+
+def result_row(task, result):
+    """Converts a task and its timed result into a record keyed by the result file columns."""
+    optimization_type, func_name, param, method_name, precision = task
+    row = {'Optimization Type': optimization_type, 'Function Name': func_name, 'Parameter': param,
+           'Method': method_name, 'Precision': precision}
+    row.update(zip(RESULT_FIELDS + LADDER_FIELDS, result))
+    return row
+
+
+def iter_rung_results(results):
+    """Expands the (ladder task, rung results) pairs of a precision ladder sweep into (task cell, result) pairs."""
+    for task, rung_results in results:
+        yield from zip(ladder_rungs(task), rung_results)
+
+
+def stream_optimization_results(rows, filename='optimization_results.npy', flush_every=100, csv_filename=None):
+    """
+    Writes result records to the columnar result file (see columnar_results.py) as they arrive, and to a CSV file as
+    well when `csv_filename` is given, flushing every `flush_every` rows so that an interrupted sweep keeps everything
+    computed so far.
+    """
+    with ExitStack() as stack:
+        table = stack.enter_context(ColumnarResultWriter(filename, flush_every))
+        if csv_filename is not None:
+            file = stack.enter_context(open(csv_filename, 'w', newline=''))
+            writer = csv.DictWriter(file, fieldnames=RESULT_COLUMNS)
+            writer.writeheader()
+        for count, row in enumerate(rows, 1):
+            table.append(row)
+            if csv_filename is not None:
+                writer.writerow(csv_row(row))
+                if count % flush_every == 0:
+                    file.flush()
 
 
 def save_optimization_results(all_interval_results, all_point_results, filename='optimization_results.csv'):
     with open(filename, 'w', newline='') as file:
-        writer = csv.writer(file)
-        writer.writerow(
-            ['Optimization Type', 'Function Name', 'Parameter', 'Method', 'Optimal x', 'Function Value', 'Iterations',
-             'Result', 'Time', 'Precision'])
+        writer = csv.DictWriter(file, fieldnames=RESULT_COLUMNS)
+        writer.writeheader()
         for precision, interval_results in all_interval_results.items():
             for func_name, results_by_name in interval_results.items():
                 for param, methods in results_by_name.items():
                     for method, results in methods.items():
-                        writer.writerow(['Interval', func_name, param, method] + list(results) + [precision])
+                        writer.writerow(result_row(('Interval', func_name, param, method, precision), results))
         for precision, point_results in all_point_results.items():
             for func_name, results_by_name in point_results.items():
                 for param, methods in results_by_name.items():
                     for method, results in methods.items():
-                        writer.writerow(['Point', func_name, param, method] + list(results) + [precision])
+                        writer.writerow(result_row(('Point', func_name, param, method, precision), results))
 
 
 def write_results(writer, optimization_type, results, precision):
@@ -110,23 +480,32 @@ def write_results(writer, optimization_type, results, precision):
                     [optimization_type, func_name, f"{optimization_type} {param}", method] + list(result) + [precision])
 
 
-def main():
+def main(workers=1, chunksize=8, resume=False, store_path='optimization_store.sqlite', settings=BenchmarkSettings(),
+         results_path='optimization_results2.npy', csv_path=None, ladder=False, profile_dir=None):
     test_functions = define_functions()
     initial_intervals = [(-2, 2), (-4, 4), (-8, 8)]
     initial_points = [0, 1, 2]
     precisions = [1e-2, 1e-4, 1e-6, 1e-8, 1e-10]  # List of precisions
     max_iterations = 1000
+    if profile_dir is not None:
+        os.makedirs(profile_dir, exist_ok=True)
 
-    all_interval_results = {}
-    all_point_results = {}
-    for precision in precisions:
-        interval_results, point_results = perform_optimizations(test_functions, initial_intervals, initial_points,
-                                                                [precision], max_iterations)
-        all_interval_results[precision] = interval_results
-        all_point_results[precision] = point_results
-
-    save_optimization_results(all_interval_results, all_point_results, 'optimization_results2.csv')
+    with ResultStore(store_path) as store:
+        # A precision ladder runs the precisions of every cell in turn, each warm-started from the previous one
+        make_tasks = iter_ladder_tasks if ladder else iter_tasks
+        tasks = make_tasks(test_functions, initial_intervals, initial_points, precisions, max_iterations)
+        results = iter_results(tasks, test_functions, max_iterations, workers, chunksize, store, resume, settings,
+                               profile_dir)
+        if ladder:
+            results = iter_rung_results(results)
+        stream_optimization_results((result_row(task, result) for task, result in results), results_path,
+                                    csv_filename=csv_path)
+    if workers == 1:
+        print(f"Compiled function cache: {function_cache.info()}")
 
 
 if __name__ == "__main__":
-    main()
+    # The sweep options are defined once, by the `sweep` subcommand of main.py
+    import sys
+    import main as pipeline
+    pipeline.main(['sweep', *sys.argv[1:]])
@@ -0,0 +1,137 @@
+import ast
+import hashlib
+import inspect
+import os
+import pickle
+import sqlite3
+import sys
+from functools import lru_cache
+from types import ModuleType
+from typing import Callable, Optional, Tuple, Union
+import sympy as sp
+from function_cache import is_symbolic
+
+
+@lru_cache(maxsize=None)
+def method_version(method: Callable) -> str:
+    """
+    Returns a short hash of the method's source code and of the source of its module and of the project modules that
+    module depends on (see `module_sources`), so that editing a method or any helper it calls, such as the bracket
+    search, the line searches or the function cache, invalidates its stored results.
+    """
+    try:
+        source = inspect.getsource(method)
+    except (OSError, TypeError):
+        source = getattr(method, '__qualname__', repr(method))
+    module = sys.modules.get(getattr(method, '__module__', None))
+    sources = (source,) + (module_sources(module) if module is not None else ())
+    return hashlib.sha256('\x1f'.join(sources).encode()).hexdigest()[:16]
+
+
+@lru_cache(maxsize=None)
+def module_sources(module: ModuleType) -> Tuple[str, ...]:
+    """
+    Returns the source of a module and of every module of the same directory it imports, directly or through another
+    of them, ordered by module name. Modules without a source file (built-in or interactive) contribute nothing.
+    """
+    path = getattr(module, '__file__', None)
+    if path is None or not path.endswith('.py'):
+        return ()
+    directory = os.path.dirname(os.path.abspath(path))
+    sources = {}
+    pending = [module.__name__]
+    while pending:
+        name = pending.pop()
+        module_path = os.path.join(directory, name + '.py')
+        if name in sources or not os.path.isfile(module_path):
+            continue
+        with open(module_path, encoding='utf-8') as file:
+            sources[name] = file.read()
+        # Every import counts, also the ones made inside functions
+        for node in ast.walk(ast.parse(sources[name])):
+            if isinstance(node, ast.Import):
+                pending.extend(alias.name for alias in node.names)
+            elif isinstance(node, ast.ImportFrom) and node.module is not None and not node.level:
+                pending.append(node.module)
+    return tuple(sources[name] for name in sorted(sources))
+
+
+def task_key(func: Union[sp.Expr, Callable], method: Callable, args: tuple, kwargs: dict, precision: float,
+             context: tuple = ()) -> str:
+    """
+    Builds the store key of a single optimization cell from the expression, the method name and source version, the
+    method arguments and the precision.
+
+    Parameters:
+    - func (sp.Expr or Callable): The optimized function; plain callables are identified by their source code.
+    - method (Callable): The optimization method.
+    - args (tuple): The positional arguments passed to the method after the function.
+    - kwargs (dict): The keyword arguments passed to the method.
+    - precision (float): The precision of the sweep cell.
+    - context (tuple): Any other settings the stored result depends on, such as the benchmark settings.
+
+    Returns:
+    str: A hex digest identifying the cell.
+    """
+    parts = [_expression_repr(func), method.__qualname__, method_version(method), repr(args),
+             repr(sorted(kwargs.items())), repr(precision), repr(tuple(context))]
+    return hashlib.sha256('\x1f'.join(parts).encode()).hexdigest()
+
+
+@lru_cache(maxsize=256)
+def _expression_repr(func: Union[sp.Expr, Callable]) -> str:
+    if is_symbolic(func):
+        return sp.srepr(func)
+    return f'{func.__module__}.{func.__qualname__}:{method_version(func)}'
+
+
+class ResultStore:
+    """
+    A local on-disk store of optimization results keyed by `task_key`. It lets an interrupted or extended sweep skip the
+    cells that have already been computed.
+    """
+
+    def __init__(self, path: str = 'optimization_store.sqlite', commit_every: int = 50):
+        """
+        Parameters:
+        - path (str): Path to the SQLite database file; it is created if it does not exist.
+        - commit_every (int): Number of new results written between commits.
+        """
+        self.path = path
+        self.commit_every = commit_every
+        self._uncommitted = 0
+        self._connection = sqlite3.connect(path)
+        # A crash may lose the last uncommitted batch, but never corrupts the stored results
+        self._connection.execute('PRAGMA journal_mode=WAL')
+        self._connection.execute('PRAGMA synchronous=NORMAL')
+        self._connection.execute('CREATE TABLE IF NOT EXISTS results (key TEXT PRIMARY KEY, result BLOB NOT NULL)')
+
+    def get(self, key: str) -> Optional[tuple]:
+        """Returns the stored result of the cell, or None if it has not been computed yet."""
+        row = self._connection.execute('SELECT result FROM results WHERE key = ?', (key,)).fetchone()
+        return pickle.loads(row[0]) if row is not None else None
+
+    def put(self, key: str, result: tuple) -> None:
+        """Stores (or replaces) the result of the cell."""
+        self._connection.execute('INSERT OR REPLACE INTO results (key, result) VALUES (?, ?)',
+                                 (key, pickle.dumps(result)))
+        self._uncommitted += 1
+        if self._uncommitted >= self.commit_every:
+            self.commit()
+
+    def commit(self) -> None:
+        self._connection.commit()
+        self._uncommitted = 0
+
+    def close(self) -> None:
+        self.commit()
+        self._connection.close()
+
+    def __len__(self) -> int:
+        return self._connection.execute('SELECT COUNT(*) FROM results').fetchone()[0]
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
@@ -0,0 +1,66 @@
+from typing import Sequence
+import numpy as np
+import pandas as pd
+
+FUNCTION_TYPES = ['Quadratic', 'Cubic', 'Quartic', 'Exponential', 'Logarithmic']
+SUMMARY_KEYS = ['Precision', 'Method', 'Family']
+
+
+def add_function_family(df: pd.DataFrame, function_types: Sequence[str] = FUNCTION_TYPES) -> pd.DataFrame:
+    """
+    Adds the categorical 'Family' column (e.g. 'Cubic' for 'Cubic 3'). The prefix is matched once per distinct function
+    name rather than once per row, and names outside `function_types` get a missing family.
+
+    Parameters:
+    - df (pd.DataFrame): The optimization results.
+    - function_types (Sequence[str]): The function families, in the order used by the summaries and plots.
+
+    Returns:
+    pd.DataFrame: A copy of the results with the 'Family' column.
+    """
+    names = df['Function Name'].astype('category')
+    families = [next((function_type for function_type in function_types if name.startswith(function_type)), None)
+                for name in names.cat.categories]
+    # The trailing -1 is the family code of a missing function name, whose category code is -1
+    family_codes = np.array([list(function_types).index(family) if family is not None else -1 for family in families]
+                            + [-1])
+    codes = family_codes[names.cat.codes.to_numpy()]
+    return df.assign(Family=pd.Categorical.from_codes(codes, categories=list(function_types)))
+
+
+def summarize(df: pd.DataFrame, function_types: Sequence[str] = FUNCTION_TYPES,
+              keys: Sequence[str] = SUMMARY_KEYS) -> pd.DataFrame:
+    """
+    Summarizes the results per precision, method and function family in a single groupby pass. Times are averaged over
+    the successful runs only, as in the plots, while the run count and the success rate cover every run.
+
+    Parameters:
+    - df (pd.DataFrame): The optimization results, with or without the 'Family' column.
+    - function_types (Sequence[str]): The function families.
+    - keys (Sequence[str]): The grouping columns, by default all of `SUMMARY_KEYS`.
+
+    Returns:
+    pd.DataFrame: A tidy table with one row per group and the columns 'Runs', 'Successes', 'Success Rate', 'Mean Time'
+    and 'Median Time'.
+    """
+    keys = list(keys)
+    if 'Family' in keys and 'Family' not in df:
+        df = add_function_family(df, function_types)
+    success = df['Result'] == 'Success'
+    df = df[keys].assign(Success=success, **{'Success Time': df['Time'].where(success)})
+    return (df.groupby(keys, observed=True, sort=True)
+            .agg(**{'Runs': ('Success', 'size'), 'Successes': ('Success Time', 'count'),
+                    'Success Rate': ('Success', 'mean'), 'Mean Time': ('Success Time', 'mean'),
+                    'Median Time': ('Success Time', 'median')})
+            .reset_index())
+
+
+def average_times(summary: pd.DataFrame, precision=None) -> pd.DataFrame:
+    """
+    Returns the mean time of the successful runs as a function family x method table, for one precision or, by default,
+    averaged over all precisions.
+    """
+    summary = summary[summary['Successes'] > 0]
+    if precision is not None:
+        summary = summary[summary['Precision'] == precision]
+    return summary.pivot_table(index='Family', columns='Method', values='Mean Time', aggfunc='mean', observed=True)
@@ -2,6 +2,8 @@ import sympy as sp
 import numpy as np
 from PointOptimizationMethods import PointOptimizationMethods
 from IntervalOptimizationMethods import IntervalOptimizationMethods
+from benchmark import BenchmarkSettings
+from multi_optimization import ladder_rungs, run_ladder, run_task
 
 x = sp.symbols("x")
 
@@ -26,4 +28,14 @@ for i in test_functions.values():
     print(PointOptimizationMethods.newtons_method(i, 1))
 
 f = x ** 3 - 3 * x - 1
-# print(IntervalOptimizationMethods.bisection_optimization(f, lower_bound=4, upper_bound=-4, delta=0.1))
\ No newline at end of file
+# print(IntervalOptimizationMethods.bisection_optimization(f, lower_bound=4, upper_bound=-4, delta=0.1, bracket=True))
+
+# A failed rung of a precision ladder must not warm-start the next one: the gradient method fails on Exponential 3
+# from x=1 below a precision of 1e-2, and returns x=0 when it does, so the ladder has to report the same failures as
+# the cold runs of its precisions
+ladder_task = ('Point', 'Exponential 3', 1, 'Gradient', (1e-2, 1e-4, 1e-6))
+ladder = run_ladder(test_functions['Exponential 3'], ladder_task, 1000, BenchmarkSettings(repeats=1))
+cold = [run_task(test_functions['Exponential 3'], rung, 1000, BenchmarkSettings(repeats=1))
+        for rung in ladder_rungs(ladder_task)]
+assert [result[3] for result in ladder] == [result[3] for result in cold] == ['Success', 'Failure', 'Failure'], \
+    [result[:4] for result in ladder]